@@ -6,136 +6,190 @@ from utils import *
 class ReadOnlyError(Exception):
     pass
 
-# This can't defend against attacks against __dict__ or using del
-# But it makes it harder, and makes a formal declaration on what's safe to change
+# Views (Public/Private data) can't defend against attacks through their class or descriptors
+# But they make it harder, and make a formal declaration on what's safe to change
 # Also easier to catch cheaters
-class ReadOnly(object):
-    """Use _RO to set what values can't be changed."""
-    def __setattr__(self, name, value):
-        if name == "_RO":
-            if name in self.__dict__ or name in self.__class__.__dict__:
-                raise ReadOnlyError("Can't edit readonly attributes after creation")
-        elif name in self._RO and name in self.__dict__ or name in self.__class__.__dict__:
-            raise ReadOnlyError("Cannot edit " + name + " in " + str(self.__class__))
-        super().__setattr__(name, value)
-
-# Can set attributes, but only when _-preceded. Used to get protected style attributes
-# Again, doesn't protect properly, but makes it harder to do / easier to detect
-class Protected(object):
-    def __setattr__(self, name, value):
-        if name == "_PROT":
-            if name in self.__dict__ or name in self.__class__.__dict__:
-                raise ReadOnlyError("Can't edit protected attributes after creation")
-        elif name in self._PROT:
-            raise ReadOnlyError("Cannot edit " + name + " in " + str(self.__class__))
-        elif name[0] == "_" and name[1:] in self._PROT:
-            name = name[1:]
-        super().__setattr__(name, value)
-
 
 class Validity(object):
+    __slots__ = ()
     @property
     def valid(self):
-        if not "_valid" in self.__dict__:
-            self._valid = True
-        return self._valid
+        return getattr(self, "_valid", True)
     @property
     def invalid(self):
-        if not "_valid" in self.__dict__:
-            self._valid = True
-        return not self._valid
+        return not self.valid
     def invalidate(self):
         self._valid = False
 
 
-class PublicData(ReadOnly, Validity):
-    def __init__(self, backer=None, for_=None):
-        """If backer isn't set, must be init'd manually with set_data. Used to avoid dependency loops."""
-        if backer is not None:
-            self.set_data(backer, for_)
-    def set_data(self, backer, for_):
-        self._RO = tuple(backer._PUBLIC_ATTRS)
-        for ro_val in self._RO:
-            self.__setattr__(ro_val,
-                public(getattr(backer, ro_val, None), for_))
-        
-class PrivateData(ReadOnly, Validity):
-    def __init__(self, backer=None, for_=None):
-        if backer is not None:
-            self.set_data(backer, for_)
-    def set_data(self, backer, for_):
-        self._RO = tuple(backer._PRIVATE_ATTRS)
-        for ro_val in self._RO:
-            self.__setattr__(ro_val,
-                private(getattr(backer, ro_val, None), for_))
-
-class StaticPublicData(Protected, Validity):
-    def __init__(self, backer=None, for_=None):
-        if backer is not None:
-            self.set_data(backer, for_)
+def _read_only_setter(name):
+    def refuse(self, value):
+        raise ReadOnlyError("Cannot edit " + name + " in " + str(self.__class__))
+    return refuse
+
+class ViewType(type):
+    """Metaclass for views. Every view class is slotted, so instances have no __dict__ to write into."""
+    def __new__(mcs, name, bases, namespace):
+        namespace.setdefault("__slots__", ())
+        return super().__new__(mcs, name, bases, namespace)
+
+# (view class, fields) to the slotted class made for them
+_view_classes = {}
+
+class View(Validity, metaclass=ViewType):
+    """A read-only projection of some of a backer's attributes.
+
+Instances are made from with_fields(fields), which gives a subclass with a slot per field.
+Each slot's descriptor is swapped for a property that refuses writes, so only the engine can fill
+fields in, through _set_view_field. Fields that are never set raise AttributeError, like a missing attribute."""
+    __slots__ = ("_valid",)
+    _FIELDS = ()
+    _MEMBERS = {} # Field name to its slot descriptor
+
+    @classmethod
+    def with_fields(cls, fields):
+        view_class = _view_classes.get((cls, fields))
+        if view_class is None:
+            # Same name as the base, so it reads the same in logs and errors
+            view_class = ViewType(cls.__name__, (cls,),
+                                  {"__slots__": tuple(fields), "__module__": cls.__module__,
+                                   "__qualname__": cls.__qualname__})
+            members = {}
+            for field in fields:
+                member = view_class.__dict__[field]
+                members[field] = member
+                setattr(view_class, field, property(member.__get__, _read_only_setter(field)))
+            view_class._FIELDS = tuple(fields)
+            view_class._MEMBERS = members
+            _view_classes[(cls, fields)] = view_class
+        return view_class
+
+def _set_view_field(view, name, value):
+    """Fill in one of a view's fields. Engine use only; views themselves have no way to write fields."""
+    view._MEMBERS[name].__set__(view, value)
+
+
+class PublicData(View):
     def set_data(self, backer, for_):
-        self._PROT = tuple(backer._PUBLIC_ATTRS)
-        for prot_val in self._PROT:
-            self.__setattr__("_"+prot_val,
-                public(getattr(backer, prot_val, None), for_))
-        
-class StaticPrivateData(Protected, Validity):
-    def __init__(self, backer=None, for_=None):
-        if backer is not None:
-            self.set_data(backer, for_)
+        for attr, member in self._MEMBERS.items():
+            member.__set__(self, public(getattr(backer, attr, None), for_))
+
+class PrivateData(View):
     def set_data(self, backer, for_):
-        self._PROT = tuple(backer._PRIVATE_ATTRS)
-        for prot_val in self._PROT:
-            self.__setattr__("_"+prot_val,
-                private(getattr(backer, prot_val, None), for_))
+        for attr, member in self._MEMBERS.items():
+            member.__set__(self, private(getattr(backer, attr, None), for_))
+
+# Static data isn't replaced when it goes out of date; its backer updates the fields in place instead
+class StaticPublicData(PublicData):
+    pass
+
+class StaticPrivateData(PrivateData):
+    pass
+
+
+
+
+
+# Counts of projections (Public/Private objects) built and reused, for benchmarking.
+PROJECTION_COUNTS = {"built": 0, "reused": 0, "shared": 0}
+
+def reset_projection_counts():
+    for key in PROJECTION_COUNTS:
+        PROJECTION_COUNTS[key] = 0
 
 
+_PROJECTION_CACHES = ("_public_for", "_public_built", "_private_for", "_private_built")
 
+def state_without_projections(obj):
+    """__getstate__ for Users: copies (e.g. from Game.fork) start with empty projection caches and build their own.
+
+Views themselves are never copied."""
+    state = obj.__dict__.copy()
+    for cache in _PROJECTION_CACHES:
+        if cache in state:
+            state[cache] = {}
+    return state
 
 
 # Class to use Public data
 # Overwrite PUBLIC_ATTRS each time, and PUBLIC_CLASS if needed
+# Projections are cached per viewer, along with the version of this object they were built from.
+# Invalidating for everyone just bumps the version, and anything built before that is rebuilt on next use.
+# Sub-objects (e.g. the cards in a play option) keep their own caches, so are reused if still valid.
 class PublicUser(object):
     _PUBLIC_ATTRS = ()
     _PUBLIC_CLASS = PublicData
+    _public_version = 0
+    def __getstate__(self):
+        return state_without_projections(self)
+    def __deepcopy__(self, memo):
+        return deepcopy_attributes(self, memo)
     def _reset_public_info(self):
         self._public_for = {}
+        self._public_built = {} # Viewer to the version their projection was built at
     def public_info(self, for_):
         if getattr(self, "_public_for", None) is None:
             self._reset_public_info()
         if not self._has_valid_pub(for_):
+            if for_ in self._public_for:
+                # Anyone still holding the old one can tell it's out of date
+                self._public_for[for_].invalidate()
             # Use lazy init to avoid dependency loops
-            self._public_for[for_] = self._PUBLIC_CLASS()
+            self._public_for[for_] = self._PUBLIC_CLASS.with_fields(self._PUBLIC_ATTRS)()
+            self._public_built[for_] = self._public_version
             self._public_for[for_].set_data(self, for_)
+            PROJECTION_COUNTS["built"] += 1
+        else:
+            PROJECTION_COUNTS["reused"] += 1
         return self._public_for[for_]
     def _has_valid_pub(self, for_):
-        return for_ in self._public_for.keys() and self._public_for[for_].valid
+        return self._public_built.get(for_) == self._public_version
     def invalidate_public(self, for_=ALL):
+        if for_ == ALL:
+            self._public_version += 1
+            return
         for targ in self._public_for.keys():
-            if for_ == ALL or targ in for_:
-                self._public_for[targ].invalidate()
+            if targ in for_:
+                self._public_built[targ] = None
 
 # Class to use Private data
 # Overwrite PRIVATE_ATTRS each time, and PRIVATE_CLASS if needed
+# Cached and versioned the same way as PublicUser.
 class PrivateUser(object):
     _PRIVATE_ATTRS = ()
     _PRIVATE_CLASS = PrivateData
+    _private_version = 0
+    def __getstate__(self):
+        return state_without_projections(self)
+    def __deepcopy__(self, memo):
+        return deepcopy_attributes(self, memo)
     def _reset_private_info(self):
         self._private_for = {}
+        self._private_built = {}
     def private_info(self, for_):
         if getattr(self, "_private_for", None) is None:
             self._reset_private_info()
         if not self._has_valid_priv(for_):
+            if for_ in self._private_for:
+                # Anyone still holding the old one can tell it's out of date
+                self._private_for[for_].invalidate()
             # Use lazy init to avoid dependency loops
-            self._private_for[for_] = self._PRIVATE_CLASS()
+            self._private_for[for_] = self._PRIVATE_CLASS.with_fields(self._PRIVATE_ATTRS)()
+            self._private_built[for_] = self._private_version
             self._private_for[for_].set_data(self, for_)
+            PROJECTION_COUNTS["built"] += 1
+        else:
+            PROJECTION_COUNTS["reused"] += 1
         return self._private_for[for_]
     def _has_valid_priv(self, for_):
-        return for_ in self._private_for.keys() and self._private_for[for_].valid
+        return self._private_built.get(for_) == self._private_version
     def invalidate_private(self, for_=ALL):
+        if for_ == ALL:
+            self._private_version += 1
+            return
         for targ in self._private_for.keys():
-            if for_ == ALL or targ in for_:
-                self._private_for[targ].invalidate()
+            if targ in for_:
+                self._private_built[targ] = None
         
 
 
@@ -146,6 +200,10 @@ class PrivateUser(object):
 class StaticPublicUser(object):
     _PUBLIC_ATTRS = ()
     _PUBLIC_CLASS = StaticPublicData
+    def __getstate__(self):
+        return state_without_projections(self)
+    def __deepcopy__(self, memo):
+        return deepcopy_attributes(self, memo)
     def _reset_public_info(self):
         self._public_for = {}
     def public_info(self, for_):
@@ -153,18 +211,19 @@ class StaticPublicUser(object):
             self._reset_public_info()
         if not for_ in self._public_for.keys():
             # Use lazy init to avoid dependency loops
-            self._public_for[for_] = self._PUBLIC_CLASS()
+            self._public_for[for_] = self._PUBLIC_CLASS.with_fields(self._PUBLIC_ATTRS)()
             self._public_for[for_].set_data(self, for_)
         return self._public_for[for_]
     def invalidate_public(self, for_=ALL):
-        # Rather than invalidating the public data, we just 're-set' the relevant attributes
-        # Due to the __setattr__ logic, this will update the data to be valid
-        for attr in self._PUBLIC_ATTRS:
-            setattr(self, attr, getattr(self, attr))
+        # Rather than invalidating the public data, we re-project the relevant attributes
+        # Anything that comes out the same as before (e.g. a hand of still-valid cards) is left alone
+        for for_, pubinfo in self._public_for.items():
+            for attr in self._PUBLIC_ATTRS:
+                _reproject(pubinfo, attr, public(getattr(self, attr), for_))
     def __setattr__(self, name, value):
         if name in self._PUBLIC_ATTRS and getattr(self, "_public_for", False):
             for for_, pubinfo in self._public_for.items():
-                setattr(pubinfo, "_"+name, public(value, for_))
+                _reproject(pubinfo, name, public(value, for_))
         super().__setattr__(name, value)
 
 
@@ -174,6 +233,10 @@ class StaticPublicUser(object):
 class StaticPrivateUser(object):
     _PRIVATE_ATTRS = ()
     _PRIVATE_CLASS = StaticPrivateData
+    def __getstate__(self):
+        return state_without_projections(self)
+    def __deepcopy__(self, memo):
+        return deepcopy_attributes(self, memo)
     def _reset_private_info(self):
         self._private_for = {}
     def private_info(self, for_):
@@ -181,28 +244,57 @@ class StaticPrivateUser(object):
             self._reset_private_info()
         if not for_ in self._private_for.keys():
             # Use lazy init to avoid dependency loops
-            self._private_for[for_] = self._PRIVATE_CLASS()
+            self._private_for[for_] = self._PRIVATE_CLASS.with_fields(self._PRIVATE_ATTRS)()
             self._private_for[for_].set_data(self, for_)
         return self._private_for[for_]
     def invalidate_private(self, for_=ALL):
-        # Rather than invalidating the private data, we just 're-set' the relevant attributes
-        # Due to the __setattr__ logic, this will update the data to be valid
-        for attr in self._PRIVATE_ATTRS:
-            setattr(self, attr, getattr(self, attr))
+        # As with invalidate_public, only changed attributes are replaced
+        for for_, privinfo in self._private_for.items():
+            for attr in self._PRIVATE_ATTRS:
+                _reproject(privinfo, attr, private(getattr(self, attr), for_))
     def __setattr__(self, name, value):
         if name in self._PRIVATE_ATTRS and getattr(self, "_private_for", False):
             for for_, privinfo in self._private_for.items():
-                setattr(privinfo, "_"+name, private(value, for_))
+                _reproject(privinfo, name, private(value, for_))
         super().__setattr__(name, value)
 
 
 
+def _same_projection(old, new):
+    """Whether a new projection is made of exactly the same objects as an old one."""
+    if old is new:
+        return True
+    if old.__class__ is tuple and new.__class__ is tuple:
+        return len(old) == len(new) and all(a is b for a, b in zip(old, new))
+    if old.__class__ is dict and new.__class__ is dict:
+        return old.keys() == new.keys() and all(old[key] is new[key] for key in old)
+    return False
+
+_UNSET = object()
+
+def _reproject(static_info, attr, value):
+    """Set a freshly projected attribute on static data, unless it's structurally the same as before.
+
+Keeping the old object means anything holding onto it (e.g. a bot's reference to a hand) stays current."""
+    if _same_projection(getattr(static_info, attr, _UNSET), value):
+        PROJECTION_COUNTS["shared"] += 1
+        return
+    _set_view_field(static_info, attr, value)
+
+
+# Types that are their own public and private versions
+_PLAIN_TYPES = (str, int, float, bool, None.__class__)
+
 # Everything should use these functions to access public/private objects.
 def public(obj, for_):
+    if obj.__class__ in _PLAIN_TYPES:
+        return obj
     # Need to convert to uid for the dicts
     uidfor_ = for_
     if getattr(for_, "type_", False) == PLAYER:
         uidfor_ = for_.uid
+    if obj.__class__ is tuple or obj.__class__ is list:
+        return tuple([public(oo, uidfor_) for oo in obj])
     try:
         return obj.public_info(uidfor_)
     except AttributeError as e:
@@ -216,9 +308,13 @@ def public(obj, for_):
         return obj
 
 def private(obj, for_):
+    if obj.__class__ in _PLAIN_TYPES:
+        return obj
     uidfor_ = for_
     if getattr(for_, "type_", False) == PLAYER:
         uidfor_ = for_.uid
+    if obj.__class__ is tuple or obj.__class__ is list:
+        return tuple([private(oo, uidfor_) for oo in obj])
     try:
         return obj.private_info(uidfor_)
     except AttributeError as e:
@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import functools
+import inspect
+import itertools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import logging
+log = logging.getLogger(__name__)
+
+from simulation import *
+
+# Running games under asyncio, for bots that wait on something (a remote client, a person, a model server).
+# The engine itself stays synchronous: Queries are asked from deep inside Event resolution, and every
+# step would otherwise have to become a coroutine. Instead each game runs in a worker thread, and when a
+# PlayerActions method returns an awaitable, that thread waits for it to finish on the event loop.
+# Games waiting on players hold a thread each, but no CPU, so the loop can run many at once.
+# That's the limit: at most MAX_GAME_THREADS games (by default) can be running, waiting or not, at a time.
+# Further games queue, unstarted, until a running one finishes; they hold no thread and never ask their
+# players anything meanwhile, so nothing deadlocks, but thousands of players can't all be waited on at once.
+# Taking waiting games off their threads would mean making the engine's Event resolution coroutines.
+# Raising the cap doesn't help much either: a waiting game is cheap (about 0.2MB, thread and all), but every game still
+# runs its turns under the GIL, and with hundreds of threads switching between them costs more than the
+# waits save (400 games with clients that take 0.2s per answer took 17s at 64 threads, 24s at 400, on one core).
+
+MAX_GAME_THREADS = 64
+
+
+class AsyncActions(PlayerActions):
+    """Base for bots whose respond_to_query and info_event are coroutines. Only runs under async_runner."""
+    async def respond_to_query(self, query):
+        raise NotImplementedError()
+
+    async def info_event(self, info):
+        pass
+
+
+_bridged_classes = {}
+
+def bridged(action_class):
+    """A subclass of action_class that runs awaitable results on the event loop in config "loop",
+and waits for them in the game's thread.
+
+Plain PlayerActions are unaffected, so sync and async bots can share a game."""
+    if action_class not in _bridged_classes:
+        class Bridged(action_class):
+            def respond_to_query(self, query):
+                return self._wait(super().respond_to_query(query))
+            def info_event(self, info):
+                return self._wait(super().info_event(info))
+            def _wait(self, result):
+                if inspect.isawaitable(result):
+                    return asyncio.run_coroutine_threadsafe(_awaited(result), self.config["loop"]).result()
+                return result
+        Bridged.__name__ = action_class.__name__
+        Bridged.__qualname__ = action_class.__qualname__
+        _bridged_classes[action_class] = Bridged
+    return _bridged_classes[action_class]
+
+async def _awaited(awaitable):
+    # run_coroutine_threadsafe only takes coroutines, not any awaitable
+    return await awaitable
+
+
+async def play_game(deck_spec, bot_classes, seed, config=None, player_config=None, executor=None):
+    """run_one_game in a worker thread, with bot_classes free to be AsyncActions. Returns the GameResult."""
+    loop = asyncio.get_running_loop()
+    seats = [bridged(cls) for cls in bot_classes]
+    player_config = {**(player_config if player_config else {}), "loop": loop}
+    return await loop.run_in_executor(executor, functools.partial(
+        run_one_game, deck_spec, seats, seed, config, player_config))
+
+
+async def simulate_async(deck_spec, bot_classes, n_games, seed=None, config=None, player_config=None,
+                         max_games=None):
+    """Like simulate, but with games running at once, max_games at a time (MAX_GAME_THREADS by default,
+as each running game holds a thread, even while waiting). The rest wait to start. Returns SimulationResults.
+
+Games are seeded exactly as simulate seeds them, so the results match for bots that don't depend on timing."""
+    results = SimulationResults(bot_names(bot_classes))
+    start = time.perf_counter()
+    seeds = game_seeds(seed, n_games)
+    with _game_executor(n_games, max_games) as executor, quiet():
+        for result in await asyncio.gather(*[play_game(deck_spec, bot_classes, game_seed, config,
+                                                       player_config, executor)
+                                             for game_seed in seeds]):
+            results.add(result)
+    results.wall_time = time.perf_counter() - start
+    return results
+
+def _game_executor(n_games, max_games=None):
+    return ThreadPoolExecutor(max_workers=max(min(n_games, max_games if max_games else MAX_GAME_THREADS), 1))
+
+
+# A remote player, over in-process queues. The messages are what a network client would be sent;
+# a socket (or websocket) could replace the queues without changing RemoteActions much.
+
+class QueueChannel:
+    """Both directions of a connection to one remote player."""
+    def __init__(self):
+        # Dicts: {"kind": "query", "id", "context", "options", "count"} or {"kind": "info", "text"}
+        self.to_client = asyncio.Queue()
+        # Answers, as dicts: {"id": the query's id, "index": into its options}
+        self.to_game = asyncio.Queue()
+
+    def close(self):
+        self.to_client.put_nowait(None)
+
+
+class RemoteActions(AsyncActions):
+    """Plays by asking a remote client, through config "channel" (a QueueChannel), and waiting for its answer.
+
+config "timeout": seconds to wait for an answer before giving up (the Game then picks for them); None to wait forever.
+Answers to earlier queries (e.g. ones that came too late) are dropped, as are indices out of range."""
+    def setup(self):
+        self.channel = self.config["channel"]
+        self.timeout = self.config.get("timeout")
+        self.query_ids = itertools.count()
+
+    async def respond_to_query(self, query):
+        options = query.options
+        query_id = next(self.query_ids)
+        count = option_count(options)
+        await self.channel.to_client.put({
+            "kind": "query", "id": query_id, "context": str(query.context), "count": count,
+            # Orderings have n! options, so they're described rather than listed
+            "options": str(options) if isinstance(options, OrderingOptions) else [str(option) for option in options]})
+        try:
+            i = await asyncio.wait_for(self._answer(query_id), self.timeout)
+        except asyncio.TimeoutError:
+            log.error(self.name + " didn't answer in time.")
+            return None
+        if type(i) is not int or not 0 <= i < count:
+            log.error(self.name + " answered with " + repr(i) + ", not an option.")
+            return None
+        return options[i]
+
+    async def _answer(self, query_id):
+        while True:
+            answer = await self.channel.to_game.get()
+            if isinstance(answer, dict) and answer.get("id") == query_id:
+                return answer.get("index")
+            log.debug("%s: dropped an answer that isn't for query %s: %r", self.name, query_id, answer)
+
+    async def info_event(self, info):
+        await self.channel.to_client.put({"kind": "info", "text": str(info.context)})
+
+
+async def random_client(channel, seed=None):
+    """A stand-in remote client, answering every query at random until the channel is closed."""
+    rng = random.Random(seed)
+    while True:
+        message = await channel.to_client.get()
+        if message is None:
+            return
+        if message["kind"] == "query":
+            await channel.to_game.put({"id": message["id"], "index": rng.randrange(message["count"])})
+
+
+async def play_remote_games(deck_spec, opponent_class, n_games, seed=None, config=None, max_games=None):
+    """n_games, each between a RemoteActions (with its own random_client) and opponent_class.
+max_games (MAX_GAME_THREADS by default) run at a time, and the rest wait to start, so no more than that
+many clients are ever waited on at once."""
+    seeds = game_seeds(seed, n_games)
+    results = SimulationResults(bot_names([RemoteActions, opponent_class]))
+    start = time.perf_counter()
+
+    async def one_game(game_seed, executor):
+        channel = QueueChannel()
+        client = asyncio.create_task(random_client(channel, game_seed))
+        # Only the remote seat gets the channel; the opponent ignores it
+        result = await play_game(deck_spec, [RemoteActions, opponent_class], game_seed, config,
+                                 {"channel": channel}, executor)
+        channel.close()
+        await client
+        return result
+
+    with _game_executor(n_games, max_games) as executor, quiet():
+        for result in await asyncio.gather(*[one_game(game_seed, executor) for game_seed in seeds]):
+            results.add(result)
+    results.wall_time = time.perf_counter() - start
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run games at once under asyncio, against stand-in remote players.")
+    parser.add_argument("--deck", default="two_immortals", choices=sorted(PRESET_DECKS))
+    parser.add_argument("--opponent", default="BasicActions",
+                        help="PlayerActions class from sample_actions to play the remote players.")
+    parser.add_argument("-n", "--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-games", type=int, default=MAX_GAME_THREADS,
+                        help="Games running at a time; each holds a thread.")
+    args = parser.parse_args(argv)
+    deck, config = PRESET_DECKS[args.deck]
+    results = asyncio.run(play_remote_games(deck, bot_class(args.opponent), args.games,
+                                            seed=args.seed, config=config, max_games=args.max_games))
+    print(results.summary())
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import numpy as np
+import logging
+log = logging.getLogger(__name__)
+
+from cl_constants import *
+
+# Who might be holding what, for bots.
+# Kept up to date one Info at a time, so a bot doesn't have to replay its infos to work it out.
+
+# Cards that guess at a value in someone's hand; a miss means they don't hold it
+GUESSING_TYPES = (GUARD, INVESTIGATOR, DEEP_ONES)
+# Context types CardBeliefs.info_event looks at
+BELIEF_TYPES = (ROUND_START, JOIN, DRAW, DISCARD, SEE_CARD, SHUFFLE, CARD_PLAY,
+                DEATH, CANCEL_DEATH, TURN_END)
+
+
+def _name(player):
+    return str(player)
+
+def _type_of(card):
+    """The card's type_, or None if it's face down to us."""
+    return getattr(card, "type_", None)
+
+
+class CardBeliefs:
+    """Probabilities of each player holding each card type, from one player's point of view.
+
+deck: dict of Card class to count, as for deck_from_dict (and the bots' "deck" config).
+me: the name of the player whose Infos are fed in, with info_event.
+Rows of probabilities are players, in the order they were first seen this round; columns are types.
+Cards we haven't seen the front of are assumed equally likely to be any unseen card,
+apart from values a player was shown not to have by a missed guess."""
+    def __init__(self, deck, me):
+        self.me = me
+        self.types = sorted({cls.type_ for cls in deck})
+        self.columns = {type_: i for i, type_ in enumerate(self.types)}
+        self.total = np.zeros(len(self.types))
+        for cls, count in deck.items():
+            self.total[self.columns[cls.type_]] += count
+        self.values = np.array([next(cls.value for cls in deck if cls.type_ == type_)
+                                for type_ in self.types])
+        self.reset(())
+
+    def reset(self, players):
+        """Start of a round: nothing is known apart from the deck list."""
+        self.rows = {}
+        self.unseen = self.total.copy() # Copies not known to be anywhere, i.e. in the deck, aside or a hidden hand
+        self.known = np.zeros((0, len(self.types))) # Copies known to be in each hand
+        self.outside = np.zeros(0) # Cards in each hand that aren't in the deck list, e.g. Brain Cases
+        self.excluded = np.zeros((0, len(self.types)), dtype=bool)
+        self.hand_sizes = np.zeros(0)
+        self.alive = np.zeros(0, dtype=bool)
+        self.guesses = [] # (player name, values) for guesses not yet known to have missed
+        self._probs = None
+        for player in players:
+            self.row(player)
+
+    def row(self, player):
+        """Row index for a player (or player name), adding a row if they're new."""
+        name = _name(player)
+        if name not in self.rows:
+            self.rows[name] = len(self.rows)
+            self.known = np.vstack((self.known, np.zeros(len(self.types))))
+            self.excluded = np.vstack((self.excluded, np.zeros(len(self.types), dtype=bool)))
+            self.outside = np.append(self.outside, 0)
+            self.hand_sizes = np.append(self.hand_sizes, 0)
+            self.alive = np.append(self.alive, True)
+        return self.rows[name]
+
+    # Queries. Each is a lookup, once the matrix has been worked out after an update.
+
+    @property
+    def probabilities(self):
+        """Matrix of the chance each player holds at least one of each type."""
+        if self._probs is None:
+            self._probs = self._compute()
+        return self._probs
+
+    def prob(self, player, type_):
+        """Chance that player holds at least one card of type_."""
+        if type_ not in self.columns or _name(player) not in self.rows:
+            return 0.0
+        return float(self.probabilities[self.rows[_name(player)], self.columns[type_]])
+
+    def holding(self, player):
+        """Dict of type_ to the chance player holds one, leaving out impossible types."""
+        if _name(player) not in self.rows:
+            return {}
+        probs = self.probabilities[self.rows[_name(player)]]
+        return {type_: float(probs[i]) for i, type_ in enumerate(self.types) if probs[i] > 0}
+
+    def remaining(self, type_=None):
+        """Copies of type_ that could still be in the deck, aside or a hidden hand. All types as a dict, if not given."""
+        if type_ is None:
+            return {type_: int(self.unseen[i]) for i, type_ in enumerate(self.types)}
+        if type_ not in self.columns:
+            return 0
+        return int(self.unseen[self.columns[type_]])
+
+    def _compute(self):
+        hidden = np.clip(self.hand_sizes - self.known.sum(axis=1) - self.outside, 0, None)
+        weights = np.where(self.excluded, 0.0, self.unseen)
+        totals = weights.sum(axis=1, keepdims=True)
+        # Chance any one hidden card is each type, then that at least one of them is
+        chance = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+        probs = 1 - (1 - chance) ** hidden[:, None]
+        probs[self.known > 0] = 1.0
+        probs[~self.alive] = 0.0
+        return probs
+
+    # Updates.
+
+    def info_event(self, info):
+        ctx = info.context
+        handler = self._HANDLERS.get(ctx.type_)
+        if handler:
+            handler(self, ctx)
+            self._probs = None
+            assert (self.known.sum(axis=1) + self.outside <= self.hand_sizes).all(), \
+                "More cards known in a hand than it holds, after " + str(ctx)
+
+    def _round_start(self, ctx):
+        self.reset(ctx.players)
+
+    def _join(self, ctx):
+        i = self.row(ctx.player)
+        if _name(ctx.player) == self.me:
+            # A prime's JOINED draw resolves before they join, so its Info never reaches them
+            self._count_own_hand(i, ctx.player)
+
+    def _draw(self, ctx):
+        i = self.row(ctx.player)
+        self._drop_guesses(ctx.player)
+        self.hand_sizes[i] += 1
+        type_ = _type_of(ctx.card)
+        if type_ in self.columns:
+            self.known[i, self.columns[type_]] += 1
+            self.unseen[self.columns[type_]] -= 1
+        # The new card could be anything
+        self.excluded[i] = False
+
+    def _discard(self, ctx):
+        i = self.row(ctx.player)
+        type_ = _type_of(ctx.card)
+        if ctx.source == INSANITY_CHECK:
+            # Straight from the deck, not from their hand
+            if type_ in self.columns:
+                self.unseen[self.columns[type_]] -= 1
+            return
+        self._drop_guesses(ctx.player)
+        self.hand_sizes[i] = max(self.hand_sizes[i] - 1, 0)
+        if type_ in self.columns:
+            self._leave_hand(i, self.columns[type_])
+        elif type_ is not None:
+            self.outside[i] = max(self.outside[i] - 1, 0)
+
+    def _see_card(self, ctx):
+        viewer, holder = ctx.players[0], ctx.players[1]
+        type_ = _type_of(ctx.card)
+        if _name(viewer) != self.me or _name(holder) == self.me or type_ not in self.columns:
+            return
+        i, j = self.row(holder), self.columns[type_]
+        if self.known[i, j] == 0 and self.known[i].sum() < self.hand_sizes[i]:
+            self.known[i, j] += 1
+            self.unseen[j] -= 1
+
+    def _shuffle(self, ctx):
+        # Shuffled from the hand of whoever played it; unseen again, as nobody knows where it is
+        controller = getattr(ctx.source, "controller", None)
+        type_ = _type_of(ctx.card)
+        if controller is None or type_ not in self.columns:
+            return
+        i, j = self.row(controller), self.columns[type_]
+        self.hand_sizes[i] = max(self.hand_sizes[i] - 1, 0)
+        if self.known[i, j] > 0:
+            self.known[i, j] -= 1
+            self.unseen[j] += 1
+
+    def _card_play(self, ctx):
+        po = ctx.play_option
+        type_ = _type_of(ctx.card)
+        if type_ in GUESSING_TYPES and po.targets and "number" in po.parameters:
+            values = (po.parameters["number"],)
+            if type_ == DEEP_ONES and po.mode == INSANE:
+                values += (1,)
+            self.guesses.extend((_name(target), values) for target in po.targets)
+        elif type_ == MIGO and po.mode == INSANE:
+            # Their whole hand goes to the controller, and they get a Brain Case (not in the deck)
+            i = self.row(ctx.player)
+            for target in po.targets:
+                j = self.row(target)
+                self.known[i] += self.known[j]
+                self.outside[i] += self.outside[j]
+                self.hand_sizes[i] += self.hand_sizes[j]
+                self.known[j] = 0
+                self.outside[j] = 1
+                self.hand_sizes[j] = 1
+                self.excluded[j] = False
+
+    def _death(self, ctx):
+        self.alive[self.row(ctx.player)] = False
+        self._drop_guesses(ctx.player)
+
+    def _cancel_death(self, ctx):
+        # A guess that would have killed them still hit
+        self._drop_guesses(ctx.player)
+
+    def _turn_end(self, ctx):
+        # Any guess that didn't kill by now missed
+        for name, values in self.guesses:
+            i = self.rows[name]
+            self.excluded[i] |= np.isin(self.values, values)
+        self.guesses = []
+
+    def _count_own_hand(self, i, player):
+        """Recount our own row from our (private) view of our hand."""
+        self.unseen += self.known[i]
+        self.known[i] = 0
+        self.outside[i] = 0
+        hand = getattr(player, "hand", ())
+        for card in hand:
+            type_ = _type_of(card)
+            if type_ in self.columns:
+                self.known[i, self.columns[type_]] += 1
+                self.unseen[self.columns[type_]] -= 1
+            else:
+                self.outside[i] += 1
+        self.hand_sizes[i] = len(hand)
+
+    def _drop_guesses(self, player):
+        name = _name(player)
+        self.guesses = [guess for guess in self.guesses if guess[0] != name]
+
+    def _leave_hand(self, i, j):
+        if self.known[i, j] > 0:
+            self.known[i, j] -= 1
+        else:
+            self.unseen[j] -= 1
+
+    _HANDLERS = {ROUND_START: _round_start,
+                 JOIN: _join,
+                 DRAW: _draw,
+                 DISCARD: _discard,
+                 SEE_CARD: _see_card,
+                 SHUFFLE: _shuffle,
+                 CARD_PLAY: _card_play,
+                 DEATH: _death,
+                 CANCEL_DEATH: _cancel_death,
+                 TURN_END: _turn_end}
+
+
+def track_beliefs(cls):
+    """Give a PlayerActions class self.beliefs, a CardBeliefs kept up to date before its own info_event.
+
+Needs the deck list as config "deck"."""
+    class BeliefActions(cls):
+        if cls.info_types != ALL:
+            info_types = tuple(cls.info_types) + tuple(t for t in BELIEF_TYPES if t not in cls.info_types)
+        def setup(self):
+            self.beliefs = CardBeliefs(self.config.get("deck", {}), self.name)
+            super().setup()
+        def info_event(self, info):
+            self.beliefs.info_event(info)
+            super().info_event(info)
+    BeliefActions.__name__ = cls.__name__
+    BeliefActions.__qualname__ = cls.__qualname__
+    BeliefActions.__doc__ = cls.__doc__
+    return BeliefActions
@@ -0,0 +1,249 @@
+import argparse
+import json
+import platform
+import timeit
+import tracemalloc
+import logging
+log = logging.getLogger(__name__)
+
+from cl_constants import *
+import access_control
+from context import Context
+from events import Event
+from library import *
+from utils import *
+
+# Micro-benchmarks for engine internals. Run as a script to print results.
+# Each bench_ function returns a dict of measurements, so they can be compared between commits.
+
+
+def _name_lookup_see_event(card, event):
+    """How Card.see_event used to dispatch: build a method name per call, then getattr."""
+    desired = "see_{t}_event".replace("{t}", event.context.type_.lower())
+    other = "see_{t}_event".replace("{t}", "other")
+    return getattr(card, desired, getattr(card, other)).__call__(event)
+
+def _bench_event(type_):
+    ctx = Context()
+    ctx.type_ = type_
+    return Event(ctx)
+
+def bench_dispatch(number=200000):
+    """Time per see_event call, for an event the card handles and one it doesn't."""
+    nope = Nope()
+    nope.discarded = True # Makes see_card_play_event return straight away, so only dispatch is timed
+    handled = _bench_event(CARD_PLAY)
+    unhandled = _bench_event(DRAW)
+    ret = {}
+    for label, event in (("handled", handled), ("unhandled", unhandled)):
+        by_name = timeit.timeit(lambda: _name_lookup_see_event(nope, event), number=number)
+        by_table = timeit.timeit(lambda: nope.see_event(event), number=number)
+        ret[label] = {"name_lookup_ns": by_name / number * 1e9,
+                      "table_ns": by_table / number * 1e9,
+                      "saving_ns": (by_name - by_table) / number * 1e9}
+    return ret
+
+def bench_projections(n_games=10, seed=0):
+    """Public/Private projections built and reused per turn, over headless BasicActions games."""
+    # Imported here, as simulation pulls in the whole engine
+    from simulation import simulate, PRESET_DECKS
+    from sample_actions import BasicActions
+    deck, config = PRESET_DECKS["two_immortals"]
+    access_control.reset_projection_counts()
+    results = simulate(deck, [BasicActions, BasicActions], n_games, seed=seed, config=config)
+    counts = dict(access_control.PROJECTION_COUNTS)
+    turns = max(results.turns, 1)
+    return {"turns": results.turns,
+            "built_per_turn": counts["built"] / turns,
+            "reused_per_turn": counts["reused"] / turns,
+            "shared_per_turn": counts["shared"] / turns,
+            "wall_time_s": results.wall_time}
+
+def bench_views(number=20000, kept=2000):
+    """Time to build a card's public view, and memory held per view."""
+    nope = Nope()
+    def build():
+        nope.invalidate_public(cascade=False)
+        return nope.public_info(0)
+    per_build = timeit.timeit(build, number=number) / number
+    tracemalloc.start()
+    views = [build() for i in range(kept)]
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"build_ns": per_build * 1e9, "bytes_per_view": held / len(views)}
+
+def _mid_round_game(turns, seed):
+    """A two player BasicActions game, a few turns into its first round."""
+    from simulation import Game, Player, silenced, deck_from_dict, PRESET_DECKS, quiet
+    from sample_actions import BasicActions
+    deck, config = PRESET_DECKS["two_immortals"]
+    g = Game()
+    seats = [Player(g, action_class=silenced(BasicActions), name=name) for name in ("A", "B")]
+    g.setup(deck_from_dict(deck, numbered=False), seats, config=config, seed=seed)
+    with quiet():
+        g.start_round()
+        for i in range(turns):
+            if not g.play_turn(g.current_player):
+                break
+            g.advance_player()
+    return g
+
+def bench_fork(number=500, turns=3, seed=0):
+    """Game.fork calls per second, a few turns into a round."""
+    g = _mid_round_game(turns, seed)
+    per_fork = timeit.timeit(g.fork, number=number) / number
+    return {"forks_per_second": 1 / per_fork, "fork_us": per_fork * 1e6,
+            "cards": len(g.all_cards), "queued_events": len(g.event_queue)}
+
+def bench_ismcts(n_games=20, rollouts=30, seed=0):
+    """ISMCTSActions against BasicActions, in both seats: win rate and time per decision."""
+    from simulation import simulate, silenced, PRESET_DECKS
+    from sample_actions import ISMCTSActions, BasicActions
+    deck, config = PRESET_DECKS["two_immortals"]
+    # Keep hold of the bots, to read their decision times afterwards
+    bots = []
+    class Recorded(ISMCTSActions):
+        def setup(self):
+            super().setup()
+            bots.append(self)
+    wins = 0
+    games = 0
+    for seats, ismcts_seat in (([Recorded, BasicActions], 0), ([BasicActions, Recorded], 1)):
+        results = simulate(deck, seats, n_games // 2, seed=seed, config=config,
+                           player_config={"rollouts": rollouts, "time_budget": 10.0})
+        wins += results.wins[ismcts_seat]
+        games += results.n_games
+    times = sorted(t for bot in bots for t in bot.decision_times)
+    return {"games": games, "win_rate": wins / games if games else 0.0,
+            "decisions": len(times), "rollouts_per_decision": rollouts,
+            "mean_decision_s": sum(times) / len(times) if times else 0.0,
+            "max_decision_s": times[-1] if times else 0.0}
+
+# Decks for the regression suite: stacked insanity, a plain deck, and mostly quick plays
+SUITE_DECKS = ("two_immortals", "plain", "nope_heavy")
+
+def bench_suite(n_games=30, seed=0, memory_games=5):
+    """Engine throughput over a fixed corpus of seeded BasicActions games, for each of SUITE_DECKS.
+
+The seeds don't change between runs, so neither do the games unless the rules do;
+counts only move when the engine does more or less work, and rates when it gets slower or faster."""
+    from simulation import simulate, PRESET_DECKS
+    from sample_actions import BasicActions
+    ret = {}
+    for name in SUITE_DECKS:
+        deck, config = PRESET_DECKS[name]
+        access_control.reset_projection_counts()
+        results = simulate(deck, [BasicActions, BasicActions], n_games, seed=seed, config=config)
+        built = access_control.PROJECTION_COUNTS["built"]
+        # Tracing slows everything down, so memory gets its own shorter run
+        tracemalloc.start()
+        simulate(deck, [BasicActions, BasicActions], memory_games, seed=seed, config=config)
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        wall_time = max(results.wall_time, 1e-9)
+        ret[name] = {"games": results.n_games, "errors": len(results.errors),
+                     "events": results.events, "queries": results.queries,
+                     "events_per_second": results.events / wall_time,
+                     "queries_per_second": results.queries / wall_time,
+                     "projections_per_game": built / max(results.n_games, 1),
+                     "peak_memory_kb": peak / 1024,
+                     "wall_time_s": results.wall_time}
+    return ret
+
+
+def bench_phases(n_games=10, seed=0):
+    """Mean time per turn step and per fired Event, from GameStats over seeded BasicActions games."""
+    from simulation import run_one_game, game_seeds, quiet, PRESET_DECKS
+    from sample_actions import BasicActions
+    from stats import GameStats
+    deck, config = PRESET_DECKS["two_immortals"]
+    stats = GameStats()
+    with quiet():
+        for game_seed in game_seeds(seed, n_games):
+            run_one_game(deck, [BasicActions, BasicActions], game_seed, config, stats=stats)
+    return {"phase_mean_us": {name: timing.mean * 1e6 for name, timing in stats.phases.items()},
+            "fire_mean_us": {type_: timing.mean * 1e6 for type_, timing in stats.fires.items()},
+            "interrupts": stats.interrupts, "refires": stats.refires}
+
+BENCHMARKS = {
+    "dispatch": bench_dispatch,
+    "projections": bench_projections,
+    "views": bench_views,
+    "fork": bench_fork,
+    "ismcts": bench_ismcts,
+    "suite": bench_suite,
+    "phases": bench_phases,
+    }
+
+
+# Comparing results between commits.
+
+# Measurements that describe the workload rather than how well it went
+_WORKLOAD = ("games", "turns", "decisions", "rollouts_per_decision", "cards", "queued_events", "events", "queries")
+
+def _flatten(results, prefix=""):
+    ret = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            ret.update(_flatten(value, prefix + key + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            ret[prefix + key] = value
+    return ret
+
+def _higher_is_better(name):
+    return name.endswith(("per_second", "win_rate", "saving_ns"))
+
+def compare(old, new, threshold=0.25):
+    """Compare two sets of results (as from main or a results file).
+
+Returns lines describing each change, and the names of measurements that got worse by more than threshold (a fraction)."""
+    old, new = _flatten(old), _flatten(new)
+    lines = []
+    regressions = []
+    for name in new:
+        if name not in old:
+            lines.append(name + ": " + "%.6g" % new[name] + " (new)")
+            continue
+        change = (new[name] - old[name]) / abs(old[name]) if old[name] else 0.0
+        worse = -change if _higher_is_better(name) else change
+        flag = ""
+        if name.rsplit(".", 1)[-1] not in _WORKLOAD and worse > threshold:
+            regressions.append(name)
+            flag = "  <- REGRESSION"
+        lines.append(name + ": " + "%.6g" % old[name] + " -> " + "%.6g" % new[name] +
+                     " (" + "%+.1f" % (change * 100) + "%)" + flag)
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run engine micro-benchmarks.")
+    parser.add_argument("names", nargs="*", help="Benchmarks to run (default all): " + ", ".join(BENCHMARKS))
+    parser.add_argument("--out", help="Write the results to this file, as JSON.")
+    parser.add_argument("--compare", help="Compare against results written earlier with --out; exits with 1 on a regression.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Fraction a measurement can get worse by before it counts as a regression (default 0.25; timings are noisy).")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error("Unknown benchmark " + name)
+    results = {}
+    for name in (args.names if args.names else BENCHMARKS):
+        results[name] = BENCHMARKS[name]()
+        print(name + ": " + json.dumps(results[name], indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)["results"]
+        lines, regressions = compare({name: old[name] for name in results if name in old}, results,
+                                     args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print(str(len(regressions)) + " regressions: " + ", ".join(regressions))
+            raise SystemExit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
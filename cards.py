@@ -1,4 +1,6 @@
+import itertools
 import logging
+from reprlib import recursive_repr
 log = logging.getLogger(__name__)
 
 from events import *
@@ -41,13 +43,12 @@ from players import *
 # Cannot subclass this (else class reveals hidden info)
 class PublicCard(PublicData):
     def set_data(self, backer, for_):
-        self._RO = tuple(backer._PUBLIC_ATTRS)
-        for ro_val in self._RO:
+        for ro_val, member in self._MEMBERS.items():
             if ro_val in backer._PUBLIC_FACEUP_ATTRS:
-                setattr(self, ro_val,
+                member.__set__(self,
                     public(getattr(backer, ro_val), for_) if backer.faceup else None)
             else:
-                setattr(self, ro_val,
+                member.__set__(self,
                     public(getattr(backer, ro_val), for_))
 
     def __str__(self):
@@ -65,13 +66,15 @@ class PrivateCard(PrivateData):
 # Base Card object, overwritten by subclass cards
 
 class Card(PublicUser, PrivateUser):
-    next_uid = 0
+    next_uid = itertools.count() # next() on this is safe across threads
     _PUBLIC_FACEUP_ATTRS = ("name", "type_", "value", "insane", "cardfront", "played_as",
                            "turn_played")
     _PUBLIC_ATTRS = _PUBLIC_FACEUP_ATTRS + ("cardback", "holder", "discarded", "faceup",
                                             "controller")
     _PUBLIC_CLASS = PublicCard
-    _PRIVATE_ATTRS = ("name", "type_", "value", "insane", "cardback", "cardfront")
+    # Holders can see how their own discards were played, as everyone else can
+    _PRIVATE_ATTRS = ("name", "type_", "value", "insane", "cardback", "cardfront", "played_as",
+                      "turn_played", "discarded")
     _PRIVATE_CLASS = PrivateCard
 
     # Overwriting attributes
@@ -89,14 +92,31 @@ class Card(PublicUser, PrivateUser):
                      #"Defaulting on two {po:targets}.", "Defaulting on more than three {po:targets}.")
     # Same, but for insane plays. Also used by sane_ops_as_insane
     ins_play_str_fmts = ()#("Insanely defaulting on no-one.", "Insanely defaulting on one or more {po:targets}.")
+    # Context types this card wants to see_event for, or ALL.
+    # Worked out from the see_XXX_event methods when the class is made, unless set explicitly.
+    listens_to = ()
+    # Context type to see_XXX_event method, used by see_event. Built when the class is made.
+    _see_dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._see_dispatch = dispatch_table(cls, "see_{t}_event")
+        if "listens_to" not in cls.__dict__:
+            cls.listens_to = cls._find_listened_types()
+
+    @classmethod
+    def _find_listened_types(cls):
+        # Overriding the catch-all methods means we can't know, so listen to everything
+        if cls.see_event is not Card.see_event or cls.see_other_event is not Card.see_other_event:
+            return ALL
+        return tuple(sorted(cls._see_dispatch))
     
     def __init__(self, cardback=None, cardfront=None, game=None):
         # The only potential distinguishing features between different cards is the back and front images
         self.cardback = self.__class__.cardback if cardback is None else cardback
         self.cardfront = self.__class__.cardfront if cardfront is None else cardfront
         self.game = game
-        self.uid = Card.next_uid
-        Card.next_uid += 1
+        self.uid = next(Card.next_uid)
         self.reset()
 
     def reset(self):
@@ -116,29 +136,41 @@ class Card(PublicUser, PrivateUser):
 
     # Public and private info management.
 
-    def invalidate_public(self, for_=ALL):
+    def invalidate_public(self, for_=ALL, cascade=True):
         """Invalidate the public info object for this card.
 
 Used when we need to 'forget' which card this is.
 E.g., if someone was keeping track of public card objects, they'd know whether a played card was the just drawn one.
 So when a card leaves or enters a zone with multiple face down cards, they're all invalidated.
 The holder's Player info is also invalidated, which will trigger recreating relevant cards.
-(Otherwise, we'd need a closure around in order to keep the Public player info up to date)."""
+(Otherwise, we'd need a closure around in order to keep the Public player info up to date).
+When invalidating a whole hand, pass cascade=False and invalidate the holder once afterwards."""
         super().invalidate_public(for_)
         # We want the public Player info to be immediately fixed up. This will make new public info for this card.
-        if self.holder:
+        if cascade and self.holder:
             self.holder.invalidate_public()
 
-    def invalidate_private(self, for_=ALL):
+    def invalidate_private(self, for_=ALL, cascade=True):
         """Like invalidate_public, but for private info."""
         super().invalidate_private(for_)
-        if self.holder:
+        if cascade and self.holder:
             self.holder.invalidate_private()
         
     # Creating targeting options.
+
+    # Whether play_options only depends on the card's class, its holder and controller, whether the holder
+    # is insane and who's targetable, so the Game can reuse them between cards and turns (see Game.play_option_specs).
+    # Cards whose options look at anything else (e.g. the rest of the hand), or that override play_options, set this False.
+    cache_play_options = True
     
     def play_options(self):
         """Returns a list of (PlayOption, forcing_level) tuples."""
+        if self.cache_play_options and self.game:
+            return [(PlayOption.from_spec(self, spec), force) for spec, force in self.game.play_option_specs(self)]
+        return self.build_play_options()
+
+    def build_play_options(self):
+        """play_options, worked out from scratch. Override sane_play_options and insane_play_options, not this."""
         return (self.insane_play_options() if self.holder.how_insane() else []) + self.sane_play_options()
     
     def sane_play_options(self):
@@ -275,13 +307,21 @@ The holder's Player info is also invalidated, which will trigger recreating rele
 
     def see_event(self, event):
         # For cards that do something when something happens; e.g. Constable heart, or no-U.
-        # Default behaviour is to use a context splitter to make sub-overriding better.
-        return split_context(event.context, self, "see_{t}_event", event)
+        # Default behaviour is to split by context type to make sub-overriding better.
+        # This is the same as split_context, but with the class's table built in advance.
+        handler = self._see_dispatch.get(event.context.type_)
+        if handler is None:
+            return self.see_other_event(event)
+        return handler(self, event)
 
     def see_other_event(self, other_event):
         # Required for the context splitter to work.
         pass
 
+    def listens_for(self, type_):
+        """Whether see_event could do anything for this context type. Used by the Game to skip cards."""
+        return self.listens_to == ALL or type_ in self.listens_to
+
     def round_end_score_edit(self, in_):
         """Make any edits to the current owner's end of round score. Return the new value."""
         # Make sure to check if card's actually discarded, if relevant.
@@ -334,6 +374,8 @@ The holder's Player info is also invalidated, which will trigger recreating rele
 
 # TODO: Should these be static?
 class PublicPlayOption(PublicData):
+    # Parameters can lead back to the option itself (e.g. No U's reversing and reversed_by), shown as ...
+    @recursive_repr()
     def __str__(self):
         ret = str(self.card)
         ret += " played as " + str(self.mode)
@@ -343,6 +385,8 @@ class PublicPlayOption(PublicData):
             
 
 class PrivatePlayOption(PrivateData):
+    # As for PublicPlayOption
+    @recursive_repr()
     def __str__(self):
         ret = str(self.card)
         ret += " played as " + str(self.mode)
@@ -387,6 +431,21 @@ class PlayOption(PublicUser, PrivateUser):
         return PlayOption(card, mode=mode, targets=targets, parameters=parameters,
                           quick=quick, can_nope=can_nope, controller=controller)
 
+    def spec(self):
+        """Enough to make this option again for another card of the same class; see from_spec."""
+        # Parameters are copied, since a chosen option's may be added to (e.g. reversed_by)
+        return (self.mode, self.targets, dict(self.parameters), self.quick, self.can_nope,
+                getattr(self, "str_fmt", None))
+
+    @classmethod
+    def from_spec(cls, card, spec):
+        """A new PlayOption for card, from another option's spec()."""
+        mode, targets, parameters, quick, can_nope, str_fmt = spec
+        po = cls(card, mode=mode, targets=targets, parameters=dict(parameters), quick=quick, can_nope=can_nope)
+        if str_fmt:
+            po.str_fmt = str_fmt
+        return po
+
     def cancel(self, source):
         self.card.cancel(source)
 
@@ -403,6 +462,99 @@ class PlayOption(PublicUser, PrivateUser):
         return None
 
 
+class PlayOptionList:
+    """List-like PlayOptions for a Query, each made only when first looked at.
+
+Holds (card, spec) pairs (see PlayOption.spec) and ready-made PlayOptions. Made options are kept,
+so looking twice gives the same object, and index() finds the one chosen."""
+    def __init__(self):
+        self._specs = []
+        self._made = []
+
+    def append(self, option):
+        self._specs.append(None)
+        self._made.append(option)
+
+    def append_spec(self, card, spec):
+        self._specs.append((card, spec))
+        self._made.append(None)
+
+    def __len__(self):
+        return len(self._made)
+
+    def __getitem__(self, i):
+        option = self._made[i]
+        if option is None:
+            card, spec = self._specs[i]
+            option = self._made[i] = PlayOption.from_spec(card, spec)
+        return option
+
+    def __iter__(self):
+        for i in range(len(self._made)):
+            yield self[i]
+
+    def __contains__(self, option):
+        # Only options already made can have been chosen
+        return any(made is option for made in self._made)
+
+    def index(self, option):
+        for i, made in enumerate(self._made):
+            if made is option:
+                return i
+        raise ValueError(str(option) + " is not one of these options.")
+
+    def public_info(self, for_):
+        return ProjectedOptions(self, public, for_)
+
+    def private_info(self, for_):
+        return ProjectedOptions(self, private, for_)
+
+    def __str__(self):
+        return liststr(self)
+
+
+class ProjectedOptions:
+    """A read-only, tuple-like view of a PlayOptionList for one viewer, as Queries show it.
+
+Each option is made and projected (with public or private) only when looked at, and kept,
+so looking twice gives the same object and index() finds the one chosen."""
+    __slots__ = ("_options", "_project", "_for", "_seen")
+
+    def __init__(self, options, project, for_):
+        self._options = options
+        self._project = project
+        self._for = for_
+        self._seen = [None] * len(options)
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self[j] for j in range(*i.indices(len(self))))
+        seen = self._seen[i]
+        if seen is None:
+            seen = self._seen[i] = self._project(self._options[i], self._for)
+        return seen
+
+    def __iter__(self):
+        for i in range(len(self._seen)):
+            yield self[i]
+
+    def __contains__(self, option):
+        # Only options already looked at can have been chosen
+        return any(seen is option for seen in self._seen)
+
+    def index(self, option):
+        for i, seen in enumerate(self._seen):
+            if seen is option:
+                return i
+        raise ValueError(str(option) + " is not one of these options.")
+
+    def __str__(self):
+        return liststr(self)
+
+
 # Convenience functions that don't need to be methods.
 
 def unforced(options):
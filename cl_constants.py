@@ -69,7 +69,8 @@ LOVECRAFT = "LOVECRAFT"
 BLANK = "BLANK"
 
 # Game settings
-GAME_SETTINGS = ("HEARTS_TO_WIN", "INSANE_HEARTS_TO_WIN", "DECK_STACKING")
+GAME_SETTINGS = ("HEARTS_TO_WIN", "INSANE_HEARTS_TO_WIN", "DECK_STACKING",
+                 "INFO_HISTORY_LIMIT", "INFO_HISTORY_SPILL", "SKIP_VIEWS")
 for setting in GAME_SETTINGS:
     globals()[setting] = setting
 
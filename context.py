@@ -5,75 +5,103 @@ log = logging.getLogger(__name__)
 from cl_constants import *
 
 from access_control import *
+from access_control import _set_view_field
 from info import *
 from utils import *
 
 def chas(ctx, attr):
+    if isinstance(ctx, View):
+        # Views have a slot for every attribute, but only the ones that were set are readable
+        return hasattr(ctx, attr)
     return attr in ctx.__dict__ or attr in ctx.__class__.__dict__
 
 def cgd(ctx, attr, default=NOT_SET):
-    return default if not chas(ctx, attr) else ctx.__dict__[attr]
+    return default if not chas(ctx, attr) else getattr(ctx, attr)
+
+# str_fmts are compiled once into literal text and a function per {field}, then reused for every context.
+# Fields: {t} type, {p} player, {ps} players, {c} card, {cs} cards, {pcs} players with cards, {s} source,
+# {po} play option, {pos} play options, {ops} options, {n} number, {nth} number as 1st/2nd...,
+# {po:target}, {po:targets}, {po:mode} or {po:<parameter>}, and {ps:<i>} for the i'th player.
+_FIELD = re.compile(r"\{(t|p|ps|c|cs|pcs|s|po|pos|ops|n|nth|po:.*?|ps:\d*)\}")
+
+def _pcs(ctx):
+    if chas(ctx, "players") and chas(ctx, "cards"):
+        return str([(str(ctx.players[i]) if ctx.players[i] else NOT_SET,
+                     str(ctx.cards[i]) if ctx.cards[i] else NOT_SET)
+                    for i in range(max(len(ctx.players),len(ctx.cards)))])
+    return NOT_SET
+
+def _nth(ctx):
+    if chas(ctx, "number"):
+        n_str = str(ctx.number)
+        return n_str + ["th", "st", "nd", "rd", "th", "th", "th", "th", "th", "th"][int(n_str[-1])]
+    return NOT_SET
+
+_FIELDS = {
+    "t": lambda ctx: str(ctx.type_),
+    "p": lambda ctx: str(cgd(ctx, "player")),
+    # TODO: nicer replacement, e.g. Alex, Beth and Charlie
+    # Make a utils 'list to English list'
+    "ps": lambda ctx: liststr(ctx.players) if chas(ctx, "players") else NOT_SET,
+    "c": lambda ctx: str(cgd(ctx, "card")),
+    "cs": lambda ctx: liststr(ctx.cards) if chas(ctx, "cards") else NOT_SET,
+    "pcs": _pcs,
+    "s": lambda ctx: str(cgd(ctx, "source")),
+    "po": lambda ctx: str(cgd(ctx, "play_option")),
+    "pos": lambda ctx: liststr(cgd(ctx, "play_options", ())),
+    "ops": lambda ctx: liststr(cgd(ctx, "options", ())),
+    "n": lambda ctx: str(cgd(ctx, "number")),
+    "nth": _nth,
+    }
+
+def _play_option_field(param):
+    def render(ctx):
+        if not chas(ctx, "play_option"):
+            return NOT_SET
+        po = ctx.play_option
+        if param == "target":
+            return str(po.targets[0])
+        elif param == "targets":
+            return liststr(po.targets)
+        elif param == "mode":
+            return str(po.mode)
+        return recstr(po.parameters.get(param, NOT_SET + " ["+param+"]"))
+    return render
+
+def _player_field(i):
+    def render(ctx):
+        if chas(ctx, "players") and len(ctx.players) > i:
+            return str(ctx.players[i])
+        return NOT_SET
+    return render
+
+_compiled = {} # str_fmt to its parts
+
+def compile_str_fmt(rstr):
+    """rstr as a tuple of literal strings and functions of a context, made once per str_fmt. See repl_str."""
+    parts = _compiled.get(rstr)
+    if parts is None:
+        parts = []
+        pos = 0
+        for match in _FIELD.finditer(rstr):
+            if match.start() > pos:
+                parts.append(rstr[pos:match.start()])
+            field = match.group(1)
+            if field.startswith("po:"):
+                parts.append(_play_option_field(field[3:]))
+            elif field.startswith("ps:"):
+                parts.append(_player_field(int(field[3:])))
+            else:
+                parts.append(_FIELDS[field])
+            pos = match.end()
+        if pos < len(rstr):
+            parts.append(rstr[pos:])
+        parts = _compiled[rstr] = tuple(parts)
+    return parts
 
 def repl_str(rstr, ctx):
-    ret = rstr
-    if "{t}" in ret:
-        ret = ret.replace("{t}", str(ctx.type_))
-    if "{p}" in ret:
-        ret = ret.replace("{p}", str(cgd(ctx, "player")))
-    if "{ps}" in ret:
-        # TODO: nicer replacement, e.g. Alex, Beth and Charlie
-        # Make a utils 'list to English list'
-        ret = ret.replace("{ps}", liststr(ctx.players) if chas(ctx, "players") else NOT_SET)
-    if "{c}" in ret:
-        ret = ret.replace("{c}", str(cgd(ctx, "card")))
-    if "{cs}" in ret:
-        ret = ret.replace("{cs}", liststr(ctx.cards) if chas(ctx, "cards") else NOT_SET)
-    if "{pcs}" in ret:
-        if chas(ctx, "players") and chas(ctx, "cards"):
-            ret = ret.replace("{pcs}",
-                  str([(str(ctx.players[i]) if ctx.players[i] else NOT_SET,
-                       str(ctx.cards[i]) if ctx.cards[i] else NOT_SET)
-                     for i in range(max(len(ctx.players),len(ctx.cards)))]))
-        else:
-            ret = ret.replace("{pcs}", NOT_SET)
-    if "{s}" in ret:
-        ret = ret.replace("{s}", str(cgd(ctx, "source")))
-    if "{po}" in ret:
-        ret = ret.replace("{po}", str(cgd(ctx, "play_option")))
-    if "{pos}" in ret:
-        ret = ret.replace("{pos}", liststr(cgd(ctx, "play_options", ())))
-    if "{ops}" in ret:
-        ret = ret.replace("{ops}", liststr(cgd(ctx, "options", ())))
-    if "{n}" in ret:
-        ret = ret.replace("{n}", str(cgd(ctx, "number")))
-    if "{nth}" in ret:
-        if chas(ctx, "number"):
-            n_str = str(ctx.number)
-            th_str = ["th", "st", "nd", "rd", "th", "th", "th", "th", "th", "th"][int(n_str[-1])]
-            ret = ret.replace("{nth}", n_str + th_str)
-        else:
-            ret = ret.replace("{nth}", NOT_SET)
-    while match := re.search(r"\{po\:(.*?)\}", ret):
-        param = match.group(1)
-        if chas(ctx,"play_option"):
-            if param == "target":
-                ret = ret.replace(match.group(0), str(ctx.play_option.targets[0]))
-            elif param == "targets":
-                ret = ret.replace(match.group(0), liststr(ctx.play_option.targets))
-            elif param == "mode":
-                ret = ret.replace(match.group(0), str(ctx.play_option.mode))
-            else:
-                ret = ret.replace(match.group(0),
-                    recstr(ctx.play_option.parameters.get(param, NOT_SET + " ["+param+"]")))
-        else:
-            ret = ret.replace(match.group(0), NOT_SET)
-    while match := re.search(r"\{ps\:(\d*)\}", ret):
-        param = int(match.group(1))
-        if chas(ctx, "players") and len(ctx.players) > param:
-            ret = ret.replace(match.group(0), str(ctx.players[param]))
-        else:
-            ret = ret.replace(match.group(0), NOT_SET)
-    return ret
+    """rstr with its {fields} filled in from ctx."""
+    return "".join(part if part.__class__ is str else part(ctx) for part in compile_str_fmt(rstr))
 
 
 CTX_ATTRS = ["type_", "player", "card", "source", "play_option",
@@ -82,25 +110,23 @@ CTX_ATTRS = ["type_", "player", "card", "source", "play_option",
 class PublicContext(PublicData):
     def set_data(self, ctx, for_):
         # Unlike the normal PublicData, does not set things to None if missing
-        self._RO = tuple(ctx._PUBLIC_ATTRS)
-        for attr in self._RO:
+        for attr, member in self._MEMBERS.items():
             if (attr in ctx.__dict__ or attr in ctx.__class__.__dict__) \
                and attr != "str_fmt":
-                setattr(self, attr, public(getattr(ctx, attr), for_))
+                member.__set__(self, public(getattr(ctx, attr), for_))
         # Also we have a distinction between internal, public and private string formatting
-        self.str_fmt = ctx.pub_str_fmt if ctx.pub_str_fmt else ctx.str_fmt
+        _set_view_field(self, "str_fmt", ctx.pub_str_fmt if ctx.pub_str_fmt else ctx.str_fmt)
     def __str__(self):
         return repl_str(self.str_fmt, self)
 
 class PrivateContext(PrivateData):
     def set_data(self, ctx, for_):
         # As with Public, does not set to None
-        self._RO = tuple(ctx._PRIVATE_ATTRS)
-        for attr in self._RO:
+        for attr, member in self._MEMBERS.items():
             if (attr in ctx.__dict__ or attr in ctx.__class__.__dict__) \
                and attr != "str_fmt":
-                setattr(self, attr, private(getattr(ctx, attr), for_))
-        self.str_fmt = ctx.pri_str_fmt if ctx.pri_str_fmt else ctx.str_fmt
+                member.__set__(self, private(getattr(ctx, attr), for_))
+        _set_view_field(self, "str_fmt", ctx.pri_str_fmt if ctx.pri_str_fmt else ctx.str_fmt)
     def __str__(self):
         return repl_str(self.str_fmt, self)
 
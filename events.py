@@ -1,3 +1,5 @@
+import copy
+import itertools
 import logging
 log = logging.getLogger(__name__)
 
@@ -23,7 +25,7 @@ from utils import *
 class Event:
     """An event that is about to happen and can be interacted with.
 These are not shown to Players; only internal use."""
-    next_uid = 0
+    next_uid = itertools.count() # next() on this is safe across threads
     def __init__(self, context, resolve_effect=None, if_cancelled=None):
         self.context = context
         self.resolve_effect = resolve_effect
@@ -41,8 +43,7 @@ These are not shown to Players; only internal use."""
         self.linked_pre = None # Which Event ran this one as a post_event
         self.linked_post = None # Which Event ran this one as a pre_event
         self.grouping = [self] # Grouped events; e.g., the discard, draw and play of a Quick Play
-        self.uid = Event.next_uid
-        Event.next_uid += 1
+        self.uid = next(Event.next_uid)
         
     def queue(self, game):
         game.queue_event(self)
@@ -183,4 +184,130 @@ These are not shown to Players; only internal use."""
 
     def __str__(self):
         return "Event: {"+ str(self.context) + "}"
+
+    def __deepcopy__(self, memo):
+        # Callbacks are usually closures over the Game, Players or Cards; copy those too
+        return deepcopy_attributes(self, memo)
     
+
+
+class _QueuedEvent:
+    """Link in an EventStack."""
+    __slots__ = ("event", "prev", "next")
+    def __init__(self, event):
+        self.event = event
+        self.prev = None
+        self.next = None
+
+class EventStack:
+    """The Game's queue of Events. The latest (top) Event is the next to fire.
+
+A doubly linked list with an index by uid, so pushing, popping and inserting just after
+a queued Event are all O(1). Iterates from the bottom (first queued) to the top.
+Finds Events as a list would, by their first (lowest) place in the stack, even if queued twice."""
+    def __init__(self, events=()):
+        # Sentinel link; its next is the bottom of the stack and its prev is the top
+        self._ends = _QueuedEvent(None)
+        self._ends.prev = self._ends.next = self._ends
+        self._by_uid = {} # To the lowest link with that uid
+        self._repeats = {} # Uids queued more than once, to how many extra times
+        self._len = 0
+        for event in events:
+            self.push(event)
+
+    def _link_after(self, link, event):
+        new = _QueuedEvent(event)
+        new.prev = link
+        new.next = link.next
+        link.next.prev = new
+        link.next = new
+        uid = event.uid
+        first = self._by_uid.get(uid)
+        if first is None:
+            self._by_uid[uid] = new
+        else:
+            # Rare; keep the index on whichever is lower
+            self._repeats[uid] = self._repeats.get(uid, 0) + 1
+            if self._first_with_uid(uid) is new:
+                self._by_uid[uid] = new
+        self._len += 1
+
+    def _first_with_uid(self, uid, link=None):
+        link = link if link else self._ends.next
+        while link is not self._ends and link.event.uid != uid:
+            link = link.next
+        return link
+
+    def _unlink(self, link):
+        link.prev.next = link.next
+        link.next.prev = link.prev
+        uid = link.event.uid
+        if uid in self._repeats:
+            self._repeats[uid] -= 1
+            if not self._repeats[uid]:
+                del self._repeats[uid]
+            if self._by_uid[uid] is link:
+                # Any others are above it
+                self._by_uid[uid] = self._first_with_uid(uid, link.next)
+        elif self._by_uid.get(uid) is link:
+            del self._by_uid[uid]
+        self._len -= 1
+        return link.event
+
+    def push(self, event):
+        """Put an Event on top."""
+        self._link_after(self._ends.prev, event)
+
+    def insert_after(self, uid, event):
+        """Put an Event just after (above) the queued Event with this uid, or at the bottom if there isn't one."""
+        self._link_after(self._by_uid.get(uid, self._ends), event)
+
+    def top(self):
+        if not self._len:
+            raise IndexError("top of an empty EventStack")
+        return self._ends.prev.event
+
+    def pop(self):
+        """Remove and return the top Event."""
+        if not self._len:
+            raise IndexError("pop from an empty EventStack")
+        return self._unlink(self._ends.prev)
+
+    def remove(self, event):
+        """Remove a specific queued Event; its lowest place, if queued twice."""
+        link = self._by_uid.get(event.uid)
+        if link is None or link.event is not event:
+            # Only reachable if another Event has the same uid; fall back to a scan
+            link = self._ends.next
+            while link is not self._ends and link.event is not event:
+                link = link.next
+            if link is self._ends:
+                raise ValueError(str(event) + " is not in the EventStack")
+        self._unlink(link)
+
+    def __contains__(self, event):
+        link = self._by_uid.get(event.uid)
+        return (link is not None and link.event is event) or any(ev is event for ev in self)
+
+    def __iter__(self):
+        link = self._ends.next
+        while link is not self._ends:
+            yield link.event
+            link = link.next
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __str__(self):
+        return liststr(self)
+
+    def __deepcopy__(self, memo):
+        # Copying link by link would recurse once per queued Event
+        new = EventStack()
+        memo[id(self)] = new
+        for event in self:
+            new.push(copy.deepcopy(event, memo))
+        return new
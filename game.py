@@ -1,4 +1,5 @@
 from collections import defaultdict
+import copy
 import random
 import logging
 log = logging.getLogger(__name__)
@@ -18,6 +19,9 @@ DEFAULT_CONFIG = {
     HEARTS_TO_WIN: 2,
     INSANE_HEARTS_TO_WIN: 3,
     DECK_STACKING: (),
+    INFO_HISTORY_LIMIT: None, # Infos kept in memory for the whole game; None for all of them
+    INFO_HISTORY_SPILL: None, # File to append Infos to once they're out of memory
+    SKIP_VIEWS: False, # Ask Players with the real objects, not Private views. Only for bots' own rollout Games
     }
 
 
@@ -33,12 +37,14 @@ class Game:
         self._settings = {}
         self.update_config(config)
         self.info_queue = []
-        self.event_queue = []
+        self.event_queue = EventStack()
         self.events_paused = False
-        self.all_info_history = []
-        self.round_info_history = []
+        self.all_info_history = InfoHistory(self.setting(INFO_HISTORY_LIMIT),
+                                            self.setting(INFO_HISTORY_SPILL))
+        self.round_info_history = InfoHistory() # Always in memory, since joining players are shown it
         self.players = [] # The promise is that this remains stable, barring priming players
-        self.player_order = [] # But this may change (Spy, priming)
+        self.turn_ring = TurnRing() # Turn order, which may change (Spy, priming). See player_order
+        self.players_changed()
         # The deck is a list of cards in the order they'll be drawn
         # Shuffling will shuffle the list in place
         # This is to allow players to look at the cardbacks in order
@@ -53,16 +59,29 @@ class Game:
         self.round_winner = None
         self.winner = None
         self.round_count = 0
+        self.turn_count = 0 # Turns started over the whole game, across all rounds
+        self.events_fired = 0 # Over the whole game, counting refires
+        self.queries_asked = 0 # Queries Players were actually asked
+        self.recorder = None # A replay.GameRecorder, if this game is being recorded
+        self.stats = None # A stats.GameStats, to time and count what the Game does
+        self.play_option_cache = {} # See play_option_specs
+        self.seed_rng()
 
     # Setup and configuration.
         
-    def setup(self, deck, players, pull_aside=None, config=None):
-        """Setup the Game configuration before starting to run anything."""
+    def setup(self, deck, players, pull_aside=None, config=None, seed=None):
+        """Setup the Game configuration before starting to run anything.
+
+seed: for the Game's random streams; the same seed, deck, config and bots give the same game."""
         if len(players) > 2*len(deck):
             # 2x to handle priming, may need to have better checking
             raise ValueError("Too many players")
         # Do configuration stuff
         self.update_config(config)
+        if seed is not None:
+            self.seed_rng(seed)
+        self.all_info_history.configure(self.setting(INFO_HISTORY_LIMIT),
+                                        self.setting(INFO_HISTORY_SPILL))
         # Set up an 'original' deck, which is then used by reset_deck
         self.all_cards = list(deck)
         for card in self.all_cards:
@@ -85,16 +104,80 @@ class Game:
     def setting(self, name, default=None):
         return self._settings[name] if name in self._settings else default
 
+    # Randomness. Nothing in a Game uses the random module directly, so games can run side by side.
+
+    def seed_rng(self, seed=None):
+        """Seed the Game's random streams. If no seed is given, one is picked with the random module.
+
+self.seed is kept, so a game can be replayed on its own."""
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed) # Shuffles and picking who starts
+        # Picking for Players who didn't answer properly; kept apart so that doesn't change the deck
+        self.fallback_rng = self.spawn_rng("FALLBACK")
+
+    def spawn_rng(self, *labels):
+        """A child stream of this Game's seed. The same seed and labels always give the same stream."""
+        return random.Random(" ".join(str(label) for label in (self.seed,) + labels))
+
+    def player_rng(self, player):
+        """The stream for a Player's PlayerActions."""
+        return self.spawn_rng(PLAYER, player.name)
+
+    # Copying, for lookahead.
+
+    def fork(self, action_class=None):
+        """An independent copy of this Game, which can be played on from the current state.
+
+Copies the deck order, aside cards, hands, discards, Player state, turn order and queued Events,
+along with the closures in Event callbacks. Projection caches aren't copied; each copy builds its own.
+Info histories aren't copied either, so Players joining the copy aren't shown the round so far.
+The copy's random stream carries on from where this Game's is.
+action_class: PlayerActions class for every Player in the copy; defaults to each Player's own.
+Actions never carry over, since they only hold views of this Game."""
+        memo = {}
+        # Histories may be backed by a file, and nothing needs them to play on
+        memo[id(self.all_info_history)] = InfoHistory(limit=0)
+        memo[id(self.round_info_history)] = InfoHistory()
+        # A Random's state is a long tuple of ints, which deepcopy would go through one by one
+        for rng in (self.rng, self.fallback_rng):
+            memo[id(rng)] = copy.copy(rng)
+        # Looking ahead isn't part of the recorded (or measured) game
+        for watcher in (self.recorder, self.stats):
+            if watcher:
+                memo[id(watcher)] = None
+        # Cached options target this Game's Players
+        memo[id(self.play_option_cache)] = {}
+        forked = copy.deepcopy(self, memo)
+        for player in forked.all_players():
+            if action_class:
+                player.action_class = action_class
+            player.actions = player.new_actions()
+        return forked
+
+    def __deepcopy__(self, memo):
+        # pull_aside is usually a closure over this Game
+        return deepcopy_attributes(self, memo)
+
     # Player handling.
             
-    def add_player(self, player, order_i=None, draw=False):
-        """Add a player to the game, optionally draw them a card, and fire all past info history into them."""
+    def add_player(self, player, order_i=None, draw=False, next_to=None):
+        """Add a player to the game, optionally draw them a card, and fire all past info history into them.
+
+order_i: where in the turn order to put them, as for list.insert. next_to: a Player to sit them just after instead."""
         # This does this via an Event to make sure the Info is sent
         if order_i is None:
             order_i = len(self.players)
+        # Players are usually made before the Game is seeded
+        player.actions.rng = self.player_rng(player)
         def do_add(ev):
             self.players.append(player)
-            self.player_order.insert(order_i, player)
+            if next_to is not None:
+                self.turn_ring.insert_after(next_to, player)
+            else:
+                self.turn_ring.insert(order_i, player)
+            self.players_changed()
         self.show_history_to_player(player)
         # When priming, this is called on the primed Player
         Event(JoinContext(player, PRIME if player.prime_count else NEW),
@@ -122,17 +205,17 @@ class Game:
         """Add a prime player to the game, using prime() from players.py."""
         # Add them just after the player they primed from
         prime_player = prime(player)
-        self.add_player(prime_player, self.players.index(player), draw=True)
+        self.add_player(prime_player, next_to=player, draw=True)
 
     def de_prime_players(self):
         """Remove all primed players from the game. Run before start of round."""
         # Each Player keeps a reference for reuse later, so don't need to save anything
         primed = [p for p in self.players if p.prime_count]
-        oprimed = [p for p in self.player_order if p.prime_count]
         for p in primed:
             self.players.remove(p)
-        for p in oprimed:
-            self.player_order.remove(p)
+            if p in self.turn_ring:
+                self.turn_ring.remove(p)
+        self.players_changed()
 
     def drop_player(self, player, source=BY_CHOICE):
         """Remove a player from the game entirely; this can only happen between rounds."""
@@ -142,7 +225,8 @@ class Game:
             raise Exception("Can't leave the game while a round is running.")
         def do_drop(ev):
             self.players.remove(player)
-            self.player_order.remove(player)
+            self.turn_ring.remove(player)
+            self.players_changed()
         Event(LeaveContext(player, source),
               resolve_effect=do_drop).queue(self)
         self.clear_event_queue()
@@ -164,12 +248,24 @@ class Game:
         player.reset()
 
     def show_history_to_player(self, player, all_=False):
-        """Show the round's Info history to a Player, or the entire game history if all_."""
-        for info in (self.all_info_history if all_ else self.round_info_history):
+        """Show the round's Info history to a Player, or the entire game history if all_.
+
+Only Infos still in memory can be shown; see the INFO_HISTORY_LIMIT setting."""
+        for info in (self.all_info_history if all_ else self.round_info_history).recent():
             info.send_to(player)
 
     # Info about players, including iterables.
 
+    def all_players(self):
+        """Every Player object in the game, including primed forms not currently playing."""
+        ret = []
+        for player in self.players:
+            player = player.unprimed()
+            while player and player not in ret:
+                ret.append(player)
+                player = player.primed_to
+        return ret
+
     def player_by_uid(self, uid):
         """Get the Player object for a specific UID."""
         for player in self.players:
@@ -177,53 +273,96 @@ class Game:
                 return player
         return None
 
+    # Who's alive, who's targetable and the play orders are asked for on every Event, so they're kept
+    # until a Player's alive or protected changes (see Player.__setattr__) or Players join or leave.
+
+    def players_changed(self):
+        """Drop the cached living and targetable Players and play orders.
+
+Called by the Game and Players themselves; anything else replacing players must call it too."""
+        self._living = None
+        self._targetable = None
+        self._play_orders = {}
+        self.turn_ring.living_changed()
+
+    @property
+    def player_order(self):
+        """The Players in turn order, as a new list; changing it changes nothing. See turn_ring."""
+        return list(self.turn_ring)
+
+    @player_order.setter
+    def player_order(self, players):
+        self.turn_ring = TurnRing(players)
+        self.players_changed()
+
+    def _living_tuple(self):
+        if self._living is None:
+            self._living = tuple(player for player in self.players if player.alive)
+        return self._living
+
     def living_players(self):
         """Get a list of living Players. No order guarantee."""
-        return [player for player in self.players if player.alive]
+        return list(self._living_tuple())
+
+    def _targetable_tuple(self):
+        if self._targetable is None:
+            self._targetable = tuple(player for player in self._living_tuple() if not player.protected)
+        return self._targetable
 
     def targetable_players(self, not_including=None):
         """List of living and unprotected Players. Optionally provide a Player or Players to ignore."""
+        if not_including is None:
+            return list(self._targetable_tuple())
         ni = not_including if isinstance(not_including, (list, tuple)) else (not_including,)
-        return [player for player in self.living_players() if not player.protected and player not in ni]
+        return [player for player in self._targetable_tuple() if player not in ni]
+
+    def play_option_specs(self, card):
+        """card.build_play_options() as (PlayOption.spec(), forcing_level) pairs, reused for any card of the same
+class in the same spot: same holder and controller, same insanity for each, and the same targetable Players.
+
+Any change of protection, death, insanity or holder changes the key, so nothing needs clearing."""
+        # How insane, not just whether: e.g. Cthulhu's win needs its controller at 2 or more
+        key = (card.__class__, card.holder.uid, card.controller.uid, card.holder.how_insane(),
+               card.controller.how_insane(), tuple(player.uid for player in self._targetable_tuple()))
+        specs = self.play_option_cache.get(key)
+        if specs is None:
+            specs = [(option.spec(), force) for option, force in card.build_play_options()]
+            self.play_option_cache[key] = specs
+        return specs
 
     def play_order(self, players=None, start_after=None, start_with=None):
         """List of players in play order. If players is not given, defaults to living players.
 
 start_after and start_with: only one can be used. Default is after current player."""
-        if players is None:
-            players = self.living_players()
         if start_after:
             if start_with:
                 raise ValueError("Can't set start_after and start_with at the same time.")
-            i = self.player_order.index(start_after) + self.turn_order
+            start = self.turn_ring.step(start_after, self.turn_order)
         elif start_with:
-            i = self.player_order.index(start_with)
+            start = start_with
         else:
             if self.current_player:
-                i = self.player_order.index(self.current_player) + self.turn_order
+                start = self.turn_ring.step(self.current_player, self.turn_order)
             else:
-                # Don't have a current player yet (pre-game?) so just say it's 0
+                # Don't have a current player yet (pre-game?) so just start from the first
                 log.info("No starting player yet; guessing at the play order.")
-                i = 0
-        ret = []
-        for j in range(len(self.player_order)):
-            next_player = self.player_order[(i+(j*self.turn_order))%len(self.player_order)]
-            if next_player in players:
-                ret.append(next_player)
-        return ret
+                start = next(iter(self.turn_ring), None)
+        if start is None:
+            return []
+        if players is None:
+            # Living Players' orders are kept until someone dies, joins or leaves
+            key = (start.uid, self.turn_order)
+            if key not in self._play_orders:
+                self._play_orders[key] = tuple(self.turn_ring.from_(start, self.turn_order, living=True))
+            return list(self._play_orders[key])
+        return [player for player in self.turn_ring.from_(start, self.turn_order) if player in players]
 
     def turns_til(self, player):
         """How many turns til this player would get to play? Return -1 if they won't (e.g. dead)."""
-        if not self.current_player:
+        if not self.current_player or player not in self.turn_ring:
             # No idea who would go first
             return -1
-        i = 0
-        cur = self.player_order.index(self.current_player)
-        while i <= len(self.player_order):
-            if self.player_order[(cur+(i*self.turn_order))%len(self.player_order)] == player:
-                return i
-            i += 1
-        return -1
+        return self.turn_ring.distance(self.current_player, player, self.turn_order)
 
     def priority_order(self, event, players=None):
         """Get the priority order of living players (or a passed in list) responding to an event.
@@ -254,7 +393,7 @@ This order is:
 
     def shuffle(self):
         """Shuffle the deck in place."""
-        random.shuffle(self.deck)
+        self.rng.shuffle(self.deck)
 
     def shuffle_in(self, card):
         """Shuffle a card into the deck."""
@@ -290,7 +429,8 @@ If none of them left either, then I guess give them a braincase?"""
 
     def stack_deck(self, order):
         """Stack the top of the deck to match order as a list of type_'s. Used for tests."""
-        log.info("Stacking the deck with " + liststr(order))
+        if log.isEnabledFor(logging.INFO):
+            log.info("Stacking the deck with " + liststr(order))
         top = []
         for type_ in order:
             for test in self.deck:
@@ -344,10 +484,7 @@ If none of them left either, then I guess give them a braincase?"""
         self.start_round()
         
         # Just keep doing turns until no longer active
-        while self.play_turn(self.current_player):
-            cur_i = self.player_order.index(self.current_player)
-            # Go to next player in turn order (play_turn will skip dead ones, with no intervening Events)
-            self.current_player = self.player_order[(cur_i + self.turn_order) % len(self.player_order)]
+        self.play_turns()
 
         # Reaching here means the round is over; did someone win?
         if self.winner:
@@ -369,6 +506,14 @@ If none of them left either, then I guess give them a braincase?"""
     def run_game(self):
         """Keep running games until we have a winner."""
         # TODO: Consider multiple winners. E.g. bishop, jester etc. Cthulu should override them all too.
+        try:
+            self._run_rounds()
+        finally:
+            # Release the spill file; later appends (e.g. inspecting the Game) reopen it
+            self.all_info_history.close()
+        log.info("Winner is: %s", self.winner)
+    
+    def _run_rounds(self):
         while self.run_round():
             # Do win calculations; for now, play one round then get the most tokens
             if self.winner:
@@ -385,8 +530,24 @@ If none of them left either, then I guess give them a braincase?"""
                     break
             if self.winner:
                 break
-        log.info("Winner is: " + str(self.winner))
     
+    def advance_player(self):
+        """Move current_player on to the next Player in turn order."""
+        # play_turn will skip dead ones, with no intervening Events
+        self.current_player = self.turn_ring.step(self.current_player, self.turn_order)
+
+    def play_turns(self, max_turns=None):
+        """Play turns from current_player onwards until the round ends, or max_turns have been played.
+
+Returns whether the round is still running. Also used by bots to play on simulated Games."""
+        turns = 0
+        while self.play_turn(self.current_player):
+            self.advance_player()
+            turns += 1
+            if max_turns is not None and turns >= max_turns:
+                break
+        return self.active
+
     def play_turn(self, player):
         """Play a turn for a player. Returns False if the round is over."""
         # Substeps return False if the round ends or the player is now dead
@@ -396,22 +557,20 @@ If none of them left either, then I guess give them a braincase?"""
         # Don't do anything if they're dead
         if not player.alive or not self.active:
             return self.active
-        if not self.start_turn(player):
-            return self.active
-        if not self.insanity_checks(player):
-            return self.active
-        if not self.try_to_draw(player):
-            return self.active
-        if not self.make_play(player):
-            return self.active
-        if not self.end_turn(player):
-            return self.active
+        stats = self.stats
+        for step in (self.start_turn, self.insanity_checks, self.try_to_draw, self.make_play, self.end_turn):
+            if not (stats.timed(stats.phases, step.__name__, step, player) if stats else step(player)):
+                return self.active
         return self.active
 
     # Dealing with starting and ending a round; note, may be halfway through something else.
 
     def start_round(self):
         """Set up ready for a round to run, then mark the Game as running."""
+        if self.recorder:
+            self.recorder.round_start(self)
+        # Each round has its own stream, so a replay can start from any round
+        self.rng = self.spawn_rng(ROUND_START, self.round_count + 1)
         # Clear out the round info history
         self.clear_round_info()
         # Reset players and game state before telling them the round has started (so all state is clean at the RoundStart event)
@@ -443,7 +602,7 @@ If none of them left either, then I guess give them a braincase?"""
         """Ask the last loser who starts; or pick randomly if there isn't one."""
         if self.last_loser is None:
             # No-one died yet; pick randomly
-            starting_player = random.choice(self.players)
+            starting_player = self.rng.choice(self.players)
             def do_set(ev):
                 self.current_player = starting_player
             Event(StartingContext(starting_player, RANDOM),
@@ -453,14 +612,10 @@ If none of them left either, then I guess give them a braincase?"""
 
     def check_one_left(self):
         """Check if only one Player is alive. Return True otherwise (so the round continues)."""
-        left = None
-        for player in self.players:
-            if player.alive:
-                if left:
-                    # Already found someone
-                    return True
-                left = player
-        trigger_round_win(self, left, LAST_ALIVE)
+        living = self._living_tuple()
+        if len(living) > 1:
+            return True
+        trigger_round_win(self, living[0] if living else None, LAST_ALIVE)
         return False
 
     def check_round_end_win(self):
@@ -518,6 +673,7 @@ If none of them left either, then I guess give them a braincase?"""
         # Doing this all as an Event to make it easier to add 'skip turn' cards
         def do_turn_up(ev):
             player.turns_played += 1
+            self.turn_count += 1
         Event(TurnStartContext(player),
               resolve_effect=do_turn_up).queue(self)
         return self.active and player.alive
@@ -554,11 +710,17 @@ If none of them left either, then I guess give them a braincase?"""
             
     def make_play(self, player):
         """Ask the player to choose a card to play, then trigger it."""
-        force_ops = {UNFORCED:[], FORCED:[], ALL_FORCED:[]}
+        force_ops = {UNFORCED:PlayOptionList(), FORCED:PlayOptionList(), ALL_FORCED:PlayOptionList()}
         for card in player.hand:
-            for option, force in card.play_options():
-                force_ops[force].append(option)
-        log.debug("force_ops: " + str(force_ops))
+            if card.cache_play_options:
+                # PlayOptions, and the bot's views of them, are only made once looked at; bots playing at random make one
+                for spec, force in self.play_option_specs(card):
+                    force_ops[force].append_spec(card, spec)
+            else:
+                for option, force in card.play_options():
+                    force_ops[force].append(option)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("force_ops: " + str(force_ops))
         if force_ops[ALL_FORCED]:
             # Must play each of these cards. Special Query for this
             mult_query = multi_play_query(force_ops[ALL_FORCED])
@@ -597,7 +759,7 @@ If none of them left either, then I guess give them a braincase?"""
             info.send(self)
 
     def clear_round_info(self):
-        self.round_info_history = []
+        self.round_info_history = InfoHistory()
 
     # Event methods (and game 'engine').
 
@@ -607,38 +769,50 @@ If none of them left either, then I guess give them a braincase?"""
 Ordering process:
 1) Find the related player for each event to order (that will be context.player, if around)
 2) If there are multiple for a specific player, then ask them which order they should run in
-3) Then put these all in priority order (determined by main event). Events without a related player go first
+3) Then put these all in priority order (determined by main event). Events without a related player go last
 
 Since addition of grouped events, the fundamental unit is a group, not an Event.
 Players don't decide order within groups, just order of groups.
 Order within a group is decided by original ordering_events order."""
-        # TODO: Pretty inefficient. Nb, must always optimise for minimum queries to players.
-        log.debug("Due to:   " + str(main_event))
-        log.debug("Ordering: " + liststr(ordering_events))
-        event_groups_by_uid = defaultdict(list)
-        event_groups_seen = []
+        # Nb, must always optimise for minimum queries to players.
+        # Linear in the number of events: groups are keyed by identity (grouped Events share one list).
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Due to:   " + str(main_event))
+            log.debug("Ordering: " + liststr(ordering_events))
+        group_events = {} # Group key to its Events, in ordering_events order
+        groupings = {} # Group key to the grouping list, for asking players
+        player_groups = {} # Player uid to their group keys, in first seen order
         players = []
         for event in ordering_events:
-            if event.grouping in event_groups_seen:
+            key = id(event.grouping)
+            if key in group_events:
+                group_events[key].append(event)
                 continue
+            group_events[key] = [event]
+            groupings[key] = event.grouping
             player = getattr(event.context, "player", None)
-            event_groups_by_uid[player.uid].append(event.grouping)
-            event_groups_seen.append(event.grouping)
-            if player and player not in players:
-                players.append(player)
-        player_order = self.priority_order(main_event, players)
+            if player:
+                if player.uid not in player_groups:
+                    player_groups[player.uid] = []
+                    players.append(player)
+                player_groups[player.uid].append(key)
         event_order = []
+        placed = set()
         # Now have the ordering of Players, so ask each Player what order their events should happen in
-        for player in player_order:
-            group_order = event_group_ordering_query(player, event_groups_by_uid[player.uid])
+        for player in self.priority_order(main_event, players):
+            keys = player_groups[player.uid]
+            if len(keys) > 1:
+                # Only ask if there's an actual choice
+                keys = [id(group) for group in
+                        event_group_ordering_query(player, [groupings[key] for key in keys])]
             # That was the order of the groups; for each group, add all its events (in original order)
-            for group in group_order:
-                for event in ordering_events:
-                    if event in group:
-                        event_order.append(event)
+            for key in keys:
+                for event in group_events[key]:
+                    event_order.append(event)
+                    placed.add(id(event))
         # Events without a player just get added on; assumption is they don't matter
         # TODO: consider making current player decide
-        event_order.extend([event for event in ordering_events if event not in event_order])
+        event_order.extend([event for event in ordering_events if id(event) not in placed])
         return event_order
 
     def queue_events(self, events, clear=True):
@@ -656,14 +830,10 @@ Will clear events *after* queuing; which means the first is last to trigger."""
 Unless clear is set to False, this will immediately try to clear the event queue too.
 Equivalent to calling queue() on an Event object."""
         if just_after:
-            try:
-                i = [e.uid for e in self.event_queue].index(just_after)
-            except ValueError:
-                # If not in the queue, put at the front
-                i = -1
-            self.event_queue.insert(i+1, event)
+            # If not in the queue, this puts it at the front (bottom)
+            self.event_queue.insert_after(just_after, event)
         else:
-            self.event_queue.append(event)
+            self.event_queue.push(event)
         self.firing_interrupted = True
         if clear:
             self.clear_event_queue()
@@ -690,15 +860,22 @@ Returns whether the queue was already paused; should only do the next resume if
         # This will do a round the houses, which may cause another Event to be queued
         # If that happens, the firing event will be interrupted, and fired again later
         # When the last event is fired and not interrupted, remove it then resolve it
+        stats = self.stats
         while self.event_queue:
-            latest = self.event_queue[-1]
+            latest = self.event_queue.top()
             if latest.fired or latest.cancelled:
                 # Remove from queue first. If an exception happens during resolution, this leaves
                 # the Event unresolved, but not being retried - we drop the exception out at the point of firing
                 # and the event queue can in theory continue
                 # Don't rely on this for control flow, since the Event may not fire when queued
+                # If it was queued twice, this removes its lowest place, leaving the top one to fire again
                 self.event_queue.remove(latest)
-                latest.resolve(self)
+                if stats:
+                    stats.timed(stats.resolves, latest.context.type_, latest.resolve, self)
+                else:
+                    latest.resolve(self)
+            elif stats:
+                stats.timed(stats.fires, latest.context.type_, self.fire_event, latest)
             else:
                 self.fire_event(latest)
         # Here is a good place to check if the round is over
@@ -710,11 +887,20 @@ Returns whether the queue was already paused; should only do the next resume if
 
 Returns True if the Event got through uninterrupted."""
         self.firing_interrupted = False
+        self.events_fired += 1
+        if self.stats and event.tried_to_fire:
+            self.stats.refires += 1
         event.fire(self)
         if not self.active:
             # Can't respond if the game's not active
             return True
-        for player in self.priority_order(event):
+        # Only players with cards listening for this type of event can respond
+        # Nobody else would be asked anything, so if there's no-one then there's nothing to do
+        type_ = event.context.type_
+        listening = [player for player in self.players if player.alive and player.listeners(type_)]
+        if not listening:
+            return True
+        for player in self.priority_order(event, listening):
             # Cards in the player's hand or discard are what can respond
             # Player itself doesn't see things, unless Querys come in
             # The cards have the business logic on them, in see_event
@@ -722,7 +908,7 @@ Returns True if the Event got through uninterrupted."""
             # the PlayOptions from see_event
             # Then the player is asked which one they want to use, if any
             all_responses = []
-            for card in player.discard + player.hand:
+            for card in player.listeners(type_):
                 quick_responses = card.see_event(event)
                 if quick_responses:
                     all_responses.extend(quick_responses)
@@ -731,6 +917,8 @@ Returns True if the Event got through uninterrupted."""
                 # This is a PlayOption which should be set as quick play appropriately
                 pick.trigger()
             if self.firing_interrupted:
+                if self.stats:
+                    self.stats.interrupts += 1
                 event.interrupt()
                 return False
         return True
@@ -1,6 +1,5 @@
 import logging
 import sys
-logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 log = logging.getLogger(__name__)
 
 from game import *
@@ -19,36 +18,67 @@ def deck_from_dict(d, numbered=True):
         for i in range(len(deck)):
             deck[i].name += " ("+str(i)+")"
     return deck
-    
+
+
+TWO_IMMORTALS_DECK = {
+    Handmaid: 1,
+    LiberIvonis: 8,
+    Guard: 10,
+    DeepOnes: 1,
+    Priest: 20,
+    Prince: 10,
+    Nope: 10,
+    NoU: 20,
+    Princess: 1,
+    Capitalist: 1,
+    MiGo: 10,
+    Cthulhu: 1}
+
+TWO_IMMORTALS_STACKING = (
+    (LIBER_IVONIS, LIBER_IVONIS, LIBER_IVONIS, LIBER_IVONIS, # Force immortality
+     GUARD, LIBER_IVONIS, GUARD, LIBER_IVONIS),
+    )
+
+# No insanity and no quick plays
+PLAIN_DECK = {
+    Guard: 5,
+    Priest: 2,
+    Handmaid: 2,
+    Prince: 2,
+    Princess: 1}
+
+# Mostly quick plays, so most plays get responded to
+NOPE_HEAVY_DECK = {
+    Guard: 6,
+    Priest: 4,
+    Handmaid: 2,
+    Prince: 4,
+    Nope: 12,
+    NoU: 12,
+    Princess: 1}
+
+# Named (deck, config) pairs, for the simulation CLI and benchmarks
+PRESET_DECKS = {
+    "two_immortals": (TWO_IMMORTALS_DECK,
+                      {HEARTS_TO_WIN: 1, INSANE_HEARTS_TO_WIN: 1,
+                       DECK_STACKING: TWO_IMMORTALS_STACKING}),
+    "plain": (PLAIN_DECK, {}),
+    "nope_heavy": (NOPE_HEAVY_DECK, {}),
+    }
+
 
 def two_immortals():
-    deck = deck_from_dict({
-        Handmaid: 1,
-        LiberIvonis: 8,
-        Guard: 10,
-        DeepOnes: 1,
-        Priest: 20,
-        Prince: 10,
-        Nope: 10,
-        NoU: 20,
-        Princess: 1,
-        Capitalist: 1,
-        MiGo: 10,
-        Cthulhu: 1})
-
-    stacking = (
-        (LIBER_IVONIS, LIBER_IVONIS, LIBER_IVONIS, LIBER_IVONIS, # Force immortality
-         GUARD, LIBER_IVONIS, GUARD, LIBER_IVONIS),
-        )
+    deck = deck_from_dict(TWO_IMMORTALS_DECK)
     g = Game()
     p1 = Player(g, action_class=InteractiveActions, name="Alice")
     p2 = Player(g, action_class=BasicActions, name="Brian")
     #p2.actions.debug = True
     #p2.actions.other = public(p1, p2)
     p2.actions.logging = False
-    g.setup(deck, [p1,p2], config={HEARTS_TO_WIN: 1, INSANE_HEARTS_TO_WIN: 1,
-                                   DECK_STACKING: stacking})
+    g.setup(deck, [p1,p2], config=PRESET_DECKS["two_immortals"][1])
     g.run_game()
 
 
-two_immortals()
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    two_immortals()
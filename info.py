@@ -1,3 +1,5 @@
+from collections import deque
+import itertools
 import logging
 log = logging.getLogger(__name__)
 
@@ -42,7 +44,7 @@ class Info(PublicUser, PrivateUser):
 
 targets can be ALL, or a specific set of Players
 All Info will still have a public part, just restricted. E.g., X sees 'X drew a Baron', Y sees 'X drew a card'"""
-    next_uid = 0
+    next_uid = itertools.count() # next() on this is safe across threads
     _PUBLIC_ATTRS = ("uid", "context")
     _PUBLIC_CLASS = PublicInfo
     _PRIVATE_ATTRS = ("uid", "context")
@@ -52,17 +54,22 @@ All Info will still have a public part, just restricted. E.g., X sees 'X drew a
         # Trying to make this not need declaring on each subclass
         self.context = context
         self.sent_to = set()
-        self.uid = Info.next_uid
-        Info.next_uid += 1
+        self.uid = next(Info.next_uid)
     def send(self, game, override=False):
-        privates = self.context.private_for()
-        if privates is None:
-            privates = ()
-        elif privates == ALL:
-            privates = game.players
+        # Projections are only built for players that want this Info, when it's sent to them
+        privates = None
         for player in game.players:
             if not override and player.uid in self.sent_to:
                 continue
+            if not player.wants_info(self):
+                self.sent_to.add(player.uid)
+                continue
+            if privates is None:
+                privates = self.context.private_for()
+                if privates is None:
+                    privates = ()
+                elif privates == ALL:
+                    privates = game.players
             if player in privates:
                 player.info_event(private(self, player))
             else:
@@ -71,6 +78,9 @@ All Info will still have a public part, just restricted. E.g., X sees 'X drew a
     def send_to(self, player, override=False):
         if not override and player.uid in self.sent_to:
             return
+        if not player.wants_info(self):
+            self.sent_to.add(player.uid)
+            return
         privates = self.context.private_for()
         if privates is None:
             player.info_event(public(self, player))
@@ -91,3 +101,93 @@ All Info will still have a public part, just restricted. E.g., X sees 'X drew a
         return repr(self.context)
     def is_(self, type_):
         return self.context.is_(type_)
+
+
+class SpilledInfo:
+    """What's kept of an Info once InfoHistory has written it to disk. Can't be sent to Players."""
+    def __init__(self, uid, type_, text):
+        self.uid = uid
+        self.type_ = type_
+        self.text = text
+    def is_(self, type_):
+        return self.type_ == type_
+    def __str__(self):
+        return self.text
+    def __repr__(self):
+        return "SpilledInfo(" + str(self.uid) + ", " + self.type_ + ", " + repr(self.text) + ")"
+
+
+class InfoHistory:
+    """Record of Infos, keeping only the latest in memory.
+
+limit: How many Infos to keep in memory. None for no limit, 0 to keep nothing.
+spill_path: If set, Infos pushed out of memory are appended to this file (one line each, public view only) rather than dropped.
+Iterating streams the spilled log (as SpilledInfos) and then the in-memory Infos, oldest first."""
+    def __init__(self, limit=None, spill_path=None):
+        self._recent = deque()
+        self._spill_file = None
+        self.spilled = 0 # Written to the spill file by this history
+        self.dropped = 0 # Pushed out of memory with nowhere to go
+        self.configure(limit, spill_path)
+
+    def configure(self, limit=None, spill_path=None):
+        if self._spill_file and spill_path != self.spill_path:
+            self.close()
+        self.limit = limit
+        self.spill_path = spill_path
+        self._trim()
+
+    def append(self, info):
+        self._recent.append(info)
+        if self.limit is not None and len(self._recent) > self.limit:
+            self._trim()
+
+    def _trim(self):
+        if self.limit is None:
+            return
+        while len(self._recent) > self.limit:
+            self._spill(self._recent.popleft())
+
+    def _spill(self, info):
+        if not self.spill_path:
+            self.dropped += 1
+            return
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, "a", encoding="utf-8")
+        # The file may outlive the Game and be read by anyone, so write what a spectator would see
+        # One line per Info; tabs separate the fields, so keep them (and newlines) out of the text
+        text = str(public(info, None)).replace("\t", " ").replace("\n", " ")
+        self._spill_file.write(str(info.uid) + "\t" + info.context.type_ + "\t" + text + "\n")
+        self.spilled += 1
+
+    def recent(self):
+        """The Infos still in memory, oldest first. Unlike spilled ones, these can be sent to Players."""
+        # Copy, in case sending one of them ends up adding to the history
+        return iter(tuple(self._recent))
+
+    def spilled_infos(self):
+        """Stream the spill file back as SpilledInfos. Includes anything already in the file beforehand."""
+        if not self.spill_path:
+            return
+        if self._spill_file:
+            self._spill_file.flush()
+        try:
+            with open(self.spill_path, encoding="utf-8") as f:
+                for line in f:
+                    uid, type_, text = line.rstrip("\n").split("\t", 2)
+                    yield SpilledInfo(int(uid), type_, text)
+        except FileNotFoundError:
+            return
+
+    def close(self):
+        if self._spill_file:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def __iter__(self):
+        yield from self.spilled_infos()
+        yield from self.recent()
+
+    def __len__(self):
+        """Number of Infos ever appended (including spilled and dropped ones)."""
+        return self.spilled + self.dropped + len(self._recent)
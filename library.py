@@ -267,6 +267,7 @@ class Princess(Card):
     type_ = PRINCESS
     value = 8
     play_str_fmts = ("Committing die with {c}.",)
+    cache_play_options = False # Whether it can shuffle depends on the rest of the hand
     def trigger_play_events(self, play_option):
         # Actually have to override this for SHUFFLE mode, since the card doesn't get played/discarded.
         if play_option.mode == SHUFFLE:
@@ -304,6 +305,7 @@ class Cthulhu(Necronomicon):
     name = "Cthulhu"
     type_ = CTHULHU
     insane = 1
+    cache_play_options = False # As for Princess; its win also depends on whether it's in the discard
     ins_play_str_fmts = ("CTHULHU FHTAGN",)
     def cthulhu_active(self):
         # Check insaneness is >= 2, ignoring this card if in the discard pile
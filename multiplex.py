@@ -0,0 +1,242 @@
+import argparse
+import collections
+import random
+import threading
+import time
+import logging
+log = logging.getLogger(__name__)
+
+from simulation import *
+
+# Many games advanced together, pausing whenever any of them needs a decision, so the decisions can be
+# made in bulk (e.g. one batched call to a model for thousands of games).
+# The engine asks Queries from deep inside Event resolution, so games can't simply be generators.
+# Instead each game runs in its own thread, but only while the scheduler has handed over to it:
+# exactly one thread runs at any time, so it works like a coroutine, and games never run side by side.
+# Threads are only started as games get going, and at most max_games (MAX_LIVE_GAMES by default) are
+# live at once; the rest wait for one to finish. That also caps how many decisions come in one step.
+# Seats can also be bots, each seat keeping its own instance per game; then every step hands each
+# bot class all its pending decisions in one PlayerActions.respond_to_queries call.
+
+MAX_LIVE_GAMES = 256
+
+
+class PendingQuery:
+    """A Query some game is waiting on. Answer with an index into query.options."""
+    def __init__(self, game_index, actions, query):
+        self.game_index = game_index # Into Multiplexer.tasks
+        self.actions = actions # The seat's PlayerActions in that game
+        self.query = query # As the player would be given it
+
+    @property
+    def player_name(self):
+        return self.actions.name
+
+    def __repr__(self):
+        return "PendingQuery(game " + str(self.game_index) + ", " + self.player_name + ": " + str(self.query.context) + ")"
+
+
+class GameTask:
+    """One game, run in a thread (from start()) that only goes while the scheduler waits on it."""
+    def __init__(self, index, deck_spec, seats, seed, config, player_config=None):
+        self.index = index
+        self.seed = seed
+        self.pending = None # PendingQuery, while paused on one
+        self.answer = None # The option chosen
+        self.result = None # GameResult, once finished
+        self._args = (deck_spec, seats, seed, config, player_config)
+        self._resume = threading.Semaphore(0)
+        self._paused = threading.Semaphore(0)
+        self._thread = None
+
+    def start(self):
+        """Start the game's thread, paused until the first advance."""
+        self._thread = threading.Thread(target=self._run, args=self._args, daemon=True)
+        self._thread.start()
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def _run(self, deck_spec, seats, seed, config, player_config):
+        self._resume.acquire()
+        try:
+            self.result = run_one_game(deck_spec, seats, seed, config,
+                                       {**(player_config if player_config else {}), "task": self})
+        finally:
+            if self.result is None:
+                self.result = GameResult(seed, None, 0, 0, 0.0, error="Stopped")
+            self._paused.release()
+
+    def ask(self, actions, query):
+        """From the game's thread: hand back to the scheduler until the query is answered. Returns the option."""
+        self.pending = PendingQuery(self.index, actions, query)
+        self._paused.release()
+        self._resume.acquire()
+        self.pending = None
+        return self.answer
+
+    def advance(self):
+        """From the scheduler: run the game until it asks something or finishes."""
+        self._resume.release()
+        self._paused.acquire()
+        if self.done:
+            # Let the thread finish, so it's gone before another game's starts
+            self._thread.join()
+
+
+class DeferredActions(PlayerActions):
+    """Passes every Query back to the Multiplexer running the game (config "task"), and waits for its answer."""
+    info_types = ()
+    batch_class = None # Answered by Multiplexer.run's answer_all, not a bot
+
+    def respond_to_query(self, query):
+        return self.config["task"].ask(self, query)
+
+    def info_event(self, info):
+        pass
+
+
+_deferred_classes = {}
+
+def deferred(action_class):
+    """A subclass of action_class whose Queries go to the Multiplexer, to be answered by
+action_class.respond_to_queries along with every other game's. Infos still go to the bot as normal."""
+    if action_class not in _deferred_classes:
+        class Deferred(action_class):
+            batch_class = action_class
+            def respond_to_query(self, query):
+                return self.config["task"].ask(self, query)
+        Deferred.__name__ = action_class.__name__
+        Deferred.__qualname__ = action_class.__qualname__
+        _deferred_classes[action_class] = Deferred
+    return _deferred_classes[action_class]
+
+
+class Multiplexer:
+    """Runs n_games seeded games together, collecting their decisions in bulk.
+
+Each step advances every game that isn't waiting until it asks something or ends, then returns all
+the PendingQuerys; answer them all with answer(), then step again. run() does the whole loop.
+Each live game holds a thread (only one of them running at a time), so at most max_games are live
+at once, MAX_LIVE_GAMES by default; the others start as live ones finish.
+
+seats: a number of seats, all answered by run's answer_all, or a list of PlayerActions classes,
+one per seat, whose respond_to_queries answer for them (DeferredActions for a seat left to answer_all)."""
+    def __init__(self, deck_spec, seats, n_games, seed=None, config=None, player_config=None,
+                 max_games=MAX_LIVE_GAMES):
+        if isinstance(seats, int):
+            seats = [DeferredActions] * seats
+        self.bot_names = bot_names(seats)
+        seats = [cls if issubclass(cls, DeferredActions) else deferred(cls) for cls in seats]
+        self.tasks = [GameTask(i, deck_spec, seats, game_seed, config, player_config)
+                      for i, game_seed in enumerate(game_seeds(seed, n_games))]
+        self.max_games = max(max_games, 1)
+        self._unstarted = collections.deque(self.tasks)
+        self._live = [] # Started and not finished, in start order
+        self._waiting = [] # Live tasks with nothing pending
+
+    @property
+    def done(self):
+        return all(task.done for task in self.tasks)
+
+    def step(self):
+        """Advance every game that can move, starting more as others finish, and return every PendingQuery."""
+        while self._start_tasks():
+            for task in self._waiting:
+                task.advance()
+            self._waiting = []
+        return [task.pending for task in self._live if task.pending]
+
+    def _start_tasks(self):
+        """Start games while there's room, and return whether any game can move."""
+        self._live = [task for task in self._live if not task.done]
+        while self._unstarted and len(self._live) < self.max_games:
+            task = self._unstarted.popleft()
+            task.start()
+            self._live.append(task)
+            self._waiting.append(task)
+        return bool(self._waiting)
+
+    def answer(self, pending, answers):
+        """Answer PendingQuerys (as returned by step) with indices into their options, in the same order."""
+        self.answer_options(pending, [query.query.options[i] for query, i in zip(pending, answers)])
+
+    def answer_options(self, pending, options):
+        """Like answer, but with the options themselves."""
+        for query, option in zip(pending, options):
+            task = self.tasks[query.game_index]
+            task.answer = option
+            self._waiting.append(task)
+
+    def answer_bots(self, pending):
+        """Answer the PendingQuerys for bot seats, one respond_to_queries call per bot class.
+Returns the rest (the DeferredActions seats')."""
+        by_class = {}
+        rest = []
+        for query in pending:
+            if query.actions.batch_class is None:
+                rest.append(query)
+            else:
+                by_class.setdefault(query.actions.batch_class, []).append(query)
+        for cls, batch in by_class.items():
+            self.answer_options(batch, cls.respond_to_queries([(query.actions, query.query) for query in batch]))
+        return rest
+
+    def run(self, answer_all=None):
+        """Play every game out. Bot seats are answered in batches by their classes; answer_all is given
+a list of the other seats' PendingQuerys and returns a list of indices.
+
+Returns SimulationResults."""
+        results = SimulationResults(self.bot_names)
+        start = time.perf_counter()
+        with quiet():
+            pending = self.step()
+            while pending:
+                pending = self.answer_bots(pending)
+                if pending:
+                    self.answer(pending, answer_all(pending))
+                pending = self.step()
+        for task in self.tasks:
+            results.add(task.result)
+        results.wall_time = time.perf_counter() - start
+        return results
+
+
+def random_answers(seed=None):
+    """An answer_all for Multiplexer.run that picks at random."""
+    rng = random.Random(seed)
+    def answer_all(pending):
+        return [rng.randrange(option_count(query.query.options)) for query in pending]
+    return answer_all
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many games together, answering their queries in bulk.")
+    parser.add_argument("--deck", default="two_immortals", choices=sorted(PRESET_DECKS))
+    parser.add_argument("--seats", type=int, default=2)
+    parser.add_argument("--bots", nargs="+", default=None,
+                        help="PlayerActions classes from sample_actions, one per seat, instead of random answers.")
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-games", type=int, default=MAX_LIVE_GAMES,
+                        help="Games live at once, each holding a thread.")
+    args = parser.parse_args(argv)
+    deck, config = PRESET_DECKS[args.deck]
+    seats = [bot_class(name) for name in args.bots] if args.bots else args.seats
+    mux = Multiplexer(deck, seats, args.games, seed=args.seed, config=config, max_games=args.max_games)
+    steps = [0]
+    batch = random_answers(args.seed)
+    def answer_all(pending):
+        steps[0] += 1
+        return batch(pending)
+    results = mux.run(answer_all)
+    print(results.summary())
+    if args.bots:
+        return results
+    print(str(steps[0]) + " batches, " + "%.1f" % (results.queries / max(steps[0], 1)) + " queries per batch")
+    return results
+
+
+if __name__ == "__main__":
+    main()
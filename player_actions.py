@@ -1,4 +1,7 @@
+import random
+
 from players import *
+from queries import OrderingOptions
 from utils import *
 from cl_constants import *
 
@@ -8,9 +11,14 @@ class PlayerActions(object):
     """The class that is overridden by bots.
 
 Is never passed anything that reveals hidden game information; only Public/Private classes."""
+    # Context types to get info_event for; ALL, or a tuple of types (empty for none at all).
+    # The Game doesn't build Public/Private Info for types a bot won't look at.
+    info_types = ALL
+
     def __init__(self, my_player, config):
         self.my_player = my_player # A PrivatePlayer object
-        self.config = None # Not decided yet
+        self.config = config if config else {} # Bot settings, given to the Player; e.g. "deck" for the deck list
+        self.rng = random.Random() # Replaced by a stream from the Game; use this rather than the random module
         self.setup()
 
     def setup(self):
@@ -28,11 +36,26 @@ Is never passed anything that reveals hidden game information; only Public/Priva
         """Return one of the values in query.options, given query.context."""
         raise NotImplementedError()
 
+    @classmethod
+    def respond_to_queries(cls, batch):
+        """Answer many Queries at once, e.g. from many games: batch is a list of (PlayerActions, query) pairs,
+the PlayerActions being instances of this class. Return the chosen options, in order.
+
+Override this to evaluate a batch together (see multiplex.py); by default it's one respond_to_query at a time."""
+        # Through cls, as the instances may be subclasses that hand respond_to_query back to this
+        return [cls.respond_to_query(actions, query) for actions, query in batch]
+
     def info_event(self, info):
         """Information about something happening."""
         raise NotImplementedError()
 
     # TODO: Convenience methods.
+    def random_option(self, options):
+        """One of options at random, from self.rng. Orderings are sampled, as there can be too many to number."""
+        if isinstance(options, OrderingOptions):
+            return options.sample(self.rng)
+        return self.rng.choice(options)
+
     @property
     def name(self):
         return self.my_player.name
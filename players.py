@@ -1,3 +1,4 @@
+import itertools
 import random
 import logging
 log = logging.getLogger(__name__)
@@ -7,6 +8,7 @@ from access_control import *
 from utils import make_name_unique
 
 RANDOM_NAMES = ["Alex", "Beth", "Chris", "David", "Emily", "Fiona", "George"]
+_GAME_CACHED_ATTRS = ("alive", "protected")
 
 
 class PublicPlayer(StaticPublicData):
@@ -29,7 +31,7 @@ class PrivatePlayer(StaticPrivateData):
 
 # TODO: a PlayerActions class that implements actual overridden functions
 class Player(StaticPublicUser, StaticPrivateUser):
-    next_uid = 0
+    next_uid = itertools.count() # next() on this is safe across threads
     _PUBLIC_ATTRS = ("uid", "name", "primed_from", "prime_count", "primed_to", "turns_played",
                      "alive", "protected", "hearts", "insane_hearts", "hand", "discard")
     _PUBLIC_CLASS = PublicPlayer
@@ -39,8 +41,7 @@ class Player(StaticPublicUser, StaticPrivateUser):
     def __init__(self, game, action_class,
                  name=None, primed_from=None, config=None):
         self.game = game
-        self.uid = Player.next_uid
-        Player.next_uid += 1
+        self.uid = next(Player.next_uid)
         if name:
             self.name = name
         else:
@@ -56,6 +57,7 @@ class Player(StaticPublicUser, StaticPrivateUser):
         self.turns_played = 0
         self.hand = []
         self.discard = []
+        self._listeners = {} # Context type to cards listening for it; see listeners()
         self.alive = True
         self.protected = False
         self.hearts = 0
@@ -64,8 +66,16 @@ class Player(StaticPublicUser, StaticPrivateUser):
         # Supposed to be for bot config; not sure where it'll point yet
         # Maybe just let it point to a file to read
         self.action_class = action_class
-        self.actions = action_class(private(self, for_=self), config)
         self.config = config # maybe shouldn't allow mutation by action class
+        self.actions = self.new_actions()
+
+    def new_actions(self):
+        """A PlayerActions from action_class and config, with its view of this Player."""
+        # Rollout Games have nothing to hide, and skip building views
+        me = self if self.game.setting(SKIP_VIEWS) else private(self, for_=self)
+        actions = self.action_class(me, self.config)
+        actions.rng = self.game.player_rng(self)
+        return actions
 
     def reset(self):
         """Reset for the start of a round."""
@@ -73,6 +83,7 @@ class Player(StaticPublicUser, StaticPrivateUser):
         self.turns_played = 0
         self.hand = []
         self.discard = []
+        self._listeners = {}
         self.protected = False
         self.actions.reset()
 
@@ -80,51 +91,89 @@ class Player(StaticPublicUser, StaticPrivateUser):
 
     def public_info(self, for_):
         # If for self, then just give the private info instead
-        if for_ == self:
+        if self._is_self(for_):
             return super().private_info(for_)
         return super().public_info(for_)
 
     def private_info(self, for_):
         # If not for self, then give the public info instead
-        if for_ != self:
+        if not self._is_self(for_):
             return super().public_info(for_)
         return super().private_info(for_)
 
+    def _is_self(self, for_):
+        # public() and private() pass the viewer's uid, not the Player
+        return for_ is self or for_ == self.uid
+
     def reset_public_private(self):
         self._reset_public_info()
         self._reset_private_info()
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # The Game keeps who's alive and targetable; see Game.players_changed
+        if name in _GAME_CACHED_ATTRS and "game" in self.__dict__:
+            self.game.players_changed()
+
+    def __getstate__(self):
+        # Actions only see views of this game, so copies don't keep them; Game.fork gives them new ones
+        state = super().__getstate__()
+        state["actions"] = None
+        return state
+
+    # Index of cards that can respond to events, by zone and context type.
+
+    def listeners(self, type_):
+        """Cards in the discard then hand (the order the Game shows events in) that listen for type_.
+
+Cached per context type until a card moves in or out of either zone."""
+        cards = self._listeners.get(type_)
+        if cards is None:
+            cards = tuple(card for card in self.discard + self.hand if card.listens_for(type_))
+            self._listeners[type_] = cards
+        return cards
+
+    def _zones_changed(self):
+        self._listeners = {}
+
     # Card movement functions. Triggers appropriate listeners.
 
     def give(self, card):
         # Disguise what the hand is
+        # Our own info is only redone once, when the card enters
         for held in self.hand:
-            held.invalidate_public()
+            held.invalidate_public(cascade=False)
         self.hand.append(card)
+        self._zones_changed()
         # This will invalidate card's public info too
         card.on_enter_zone(self)
 
     def take(self, card):
         self.hand.remove(card)
+        self._zones_changed()
         card.on_leave_zone()
         # Disguise what the hand is
         for held in self.hand:
-            held.invalidate_public()
+            held.invalidate_public(cascade=False)
+        self.invalidate_public()
 
     def hand_to_discard(self, card):
         # Does not call on_leave_zone
         self.hand.remove(card)
         self.put_in_discard(card)
         for held in self.hand:
-            held.invalidate_public()
+            held.invalidate_public(cascade=False)
+        self.invalidate_public()
 
     def put_in_discard(self, card):
         self.discard.append(card)
+        self._zones_changed()
         card.discarded = True
         card.on_enter_zone(self)
 
     def take_from_discard(self, card):
         self.discard.remove(card)
+        self._zones_changed()
         card.discarded = False
         card.on_leave_zone()
 
@@ -136,6 +185,11 @@ class Player(StaticPublicUser, StaticPrivateUser):
     def info_event(self, info):
         return self.actions.info_event(info)
 
+    def wants_info(self, info):
+        """Whether this Player's actions look at this Info at all. See PlayerActions.info_types."""
+        info_types = self.actions.info_types
+        return info_types == ALL or info.context.type_ in info_types
+
     # Name management. TODO: the game object doesn't exist, so making a name unique should be in the Game, not here.
 
     def generate_name(self):
@@ -1,5 +1,4 @@
-import random
-import math
+import time
 import logging
 log = logging.getLogger(__name__)
 
@@ -35,12 +34,15 @@ The context is to help the player being asked know what's going on"""
         return self.context.is_(type_)
 
     def ask(self, player):
-        if not still_ask(self.context.type_) and len(self.options) <= 1:
+        if not still_ask(self.context.type_) and option_count(self.options) <= 1:
             # Only one choice, so don't ask
             # But do ask for some types of Query, for a facsimile of agency and better play experience
             return self.outcome(self.options[0])
+        player.game.queries_asked += 1
+        stats = player.game.stats
+        start = time.perf_counter() if stats else None
         try:
-            privateQ = private(self, player)
+            privateQ = self if player.game.setting(SKIP_VIEWS) else private(self, player)
             chosen = player.respond_to_query(privateQ)
         except NotImplementedError:
             chosen = None
@@ -52,11 +54,15 @@ The context is to help the player being asked know what's going on"""
             log.error(str(player) + " tried to edit the query they were given.")
         if chosen in privateQ.options:
             i = privateQ.options.index(chosen)
-            return self.outcome(self.options[i])
         else:
             # I guess we choose for them
             log.error(str(player) + " didn't pick a valid option")
-            return self.outcome(random.choice(self.options))
+            i = player.game.fallback_rng.randrange(option_count(self.options))
+        if stats:
+            stats.add(stats.queries, (player.name, self.context.type_), time.perf_counter() - start)
+        if player.game.recorder:
+            player.game.recorder.choice(i)
+        return self.outcome(self.options[i])
 
     def __str__(self):
         return str(self.context)
@@ -64,44 +70,162 @@ The context is to help the player being asked know what's going on"""
 
 # Specially created option classes, for specific types of Querys
 
+_factorials = (1,)
+
+def factorial(n):
+    """n!, from a table that's grown as needed."""
+    global _factorials
+    table = _factorials
+    if n >= len(table):
+        # Built aside and swapped in whole, so other threads never see it half done
+        table = list(table)
+        while len(table) <= n:
+            table.append(table[-1] * len(table))
+        _factorials = table = tuple(table)
+    return table[n]
+
+
+# Below this many items, list.pop (O(n) but in C) beats the Fenwick tree's O(log n) in Python
+_FENWICK_FROM = 64
+
+
+class _FreeSlots:
+    """Which of n positions are still free, as a Fenwick tree of ones and zeros.
+
+Counting the free positions before one, and finding the k'th free one, are both O(log n)."""
+    def __init__(self, n):
+        self.n = n
+        self.tree = [0] * (n + 1)
+        for i in range(1, n + 1):
+            self.tree[i] += 1
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+        self.top = 1 << (n.bit_length() - 1) if n else 0 # Highest power of two <= n
+
+    def take(self, pos):
+        i = pos + 1
+        while i <= self.n:
+            self.tree[i] -= 1
+            i += i & -i
+
+    def free_before(self, pos):
+        total = 0
+        i = pos
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def kth_free(self, k):
+        """The position of the k'th free slot, counting from 0."""
+        pos = 0
+        step = self.top
+        while step:
+            if pos + step <= self.n and self.tree[pos + step] <= k:
+                pos += step
+                k -= self.tree[pos]
+            step >>= 1
+        return pos
+
+
 class OrderingOptions:
     """List-like object for more safely enumerating n! options.
-Not recommended for Players to enumerate all values.
-Will only ever be on its own, not with other options."""
+Not recommended for Players to enumerate all values; use sample to pick one at random
+(len, and so random.choice, only work up to 20 items).
+Will only ever be on its own, not with other options.
+
+Orderings are numbered by their Lehmer code, so index and [] are O(n log n) rather than building the list."""
     def __init__(self, iterable):
         self._items = tuple(iterable)
     def get_int_items(self):
         return self._items
+    def _ids(self):
+        """id of each item to its position. Built when first needed, and never copied, as copies' items have new ids."""
+        by_id = self.__dict__.get("_by_id")
+        if by_id is None:
+            by_id = self._by_id = {id(item): i for i, item in enumerate(self._items)}
+        return by_id
+    def __getstate__(self):
+        # Used by deepcopy and pickle (so Game.fork) too
+        state = self.__dict__.copy()
+        state.pop("_by_id", None)
+        return state
+    def _positions(self, perm):
+        """Where each item of perm is in the items, or None if perm isn't an ordering of them."""
+        if not isinstance(perm, (tuple, list)) or len(perm) != len(self._items):
+            return None # E.g. None from a Player who didn't answer
+        # Usually the Player hands back the items themselves
+        by_id = self._ids()
+        positions = [by_id.get(id(item)) for item in perm]
+        if None not in positions and len(set(positions)) == len(positions):
+            return positions
+        used = [False] * len(self._items)
+        positions = []
+        for item in perm:
+            i = by_id.get(id(item))
+            if i is None or used[i]:
+                # Not one of the items themselves, so look for an equal one
+                i = next((j for j, other in enumerate(self._items) if not used[j] and other == item), None)
+                if i is None:
+                    return None
+            used[i] = True
+            positions.append(i)
+        return positions
     def index(self, perm):
-        if perm not in self:
+        positions = self._positions(perm)
+        if positions is None:
             raise ValueError(str(perm) + " is not a valid permutation of " + str(self._items))
-        avail = list(self._items)
-        i = 0
+        n = len(positions)
+        factorial(n) # Fill the table first
         ret = 0
-        while avail:
-            p = perm[i]
-            j = avail.index(p)
-            avail.pop(j)
-            ret += j*math.factorial(len(avail))
-            i += 1
+        if n < _FENWICK_FROM:
+            avail = list(range(n))
+            for k, pos in enumerate(positions):
+                j = avail.index(pos)
+                avail.pop(j)
+                ret += j * _factorials[n - 1 - k]
+            return ret
+        slots = _FreeSlots(n)
+        for k, pos in enumerate(positions):
+            ret += slots.free_before(pos) * _factorials[n - 1 - k]
+            slots.take(pos)
         return ret
+    def sample(self, rng):
+        """A uniformly random ordering, using rng (e.g. a PlayerActions' self.rng)."""
+        items = list(self._items)
+        rng.shuffle(items)
+        return tuple(items)
     def private_info(self, for_):
         """This is readonly already, so just return self."""
         return self
     def __getitem__(self, i):
-        avail = list(self._items)
+        n = len(self._items)
+        # Not len(self), which can't be more than sys.maxsize: past 20 items, only sample picks at random
+        count = factorial(n)
+        if i < 0:
+            i += count
+        if not 0 <= i < count:
+            raise IndexError("Ordering " + str(i) + " out of range.")
         ret = []
-        ii = i
-        while avail:
-            j = math.floor(ii / math.factorial(len(avail)-1))
-            ii -= j*math.factorial(len(avail)-1)
-            ret.append(avail.pop(j))
+        if n < _FENWICK_FROM:
+            avail = list(self._items)
+            for k in range(n - 1, -1, -1):
+                j, i = divmod(i, _factorials[k])
+                ret.append(avail.pop(j))
+            return tuple(ret)
+        slots = _FreeSlots(n)
+        for k in range(n - 1, -1, -1):
+            j, i = divmod(i, _factorials[k])
+            pos = slots.kth_free(j)
+            slots.take(pos)
+            ret.append(self._items[pos])
         return tuple(ret)
     def __len__(self):
-        return math.factorial(len(self._items))
+        return factorial(len(self._items))
     def __contains__(self, item):
-        """Compare length and containment."""
-        return all([i in self._items for i in item]) and len(item) == len(self._items)
+        """Whether item is an ordering of exactly these items."""
+        return self._positions(item) is not None
     def __str__(self):
         return "All combinations of " + liststr(self._items)
     def __repr__(self):
@@ -125,3 +249,10 @@ Will only ever be on its own, not with other options."""
 
 class NyarlathotepOptions(OrderingOptions):
     pass
+
+
+def option_count(options):
+    """How many options there are. Unlike len, also works for OrderingOptions of more than 20 items."""
+    if isinstance(options, OrderingOptions):
+        return factorial(len(options.get_int_items()))
+    return len(options)
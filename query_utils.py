@@ -50,8 +50,10 @@ def ask_which_card(asked, context):
     hand_size = len(asked.hand)
     if hand_size > 1:
         for card in asked.hand:
-            card.invalidate_private()
-            card.invalidate_public()
+            card.invalidate_private(cascade=False)
+            card.invalidate_public(cascade=False)
+        asked.invalidate_private()
+        asked.invalidate_public()
     return Query(context=WhichCardContext(context),
                  options=asked.hand,
                  outcome=pass_through).ask(asked)
@@ -76,6 +78,9 @@ def ask_quick_play_query(asked, play_context, quick_play_ops):
 
 def event_group_ordering_query(asked, event_groups):
     """Ask what ordering a bunch of Event groups should go in."""
+    if len(event_groups) <= 1:
+        # Nothing to choose, so don't build the options or ask
+        return tuple(event_groups)
     actual_events = OrderingOptions(event_groups)
     contexts_only = OrderingOptions([[ev.context for ev in group] for group in event_groups])
     def swap_to_events(chosen):
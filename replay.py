@@ -0,0 +1,183 @@
+import json
+import struct
+import logging
+log = logging.getLogger(__name__)
+
+from game import *
+from players import *
+from player_actions import *
+import library
+from game_runner import deck_from_dict
+
+# Compact replays. A game is fully decided by its seed, deck, config, seats and the index
+# chosen for every Query, so that's all a replay keeps.
+#
+# File layout:
+#   MAGIC
+#   header: varint length, then JSON (seed, deck as class name to count, config, seat names)
+#   choices: one varint per Query.ask, every round one after the other
+#   index: JSON, per round the offset of its first choice, how many there are,
+#          and the state carried in from earlier rounds (hearts, primes, last loser)
+#   trailer: the index's offset (8 bytes, little endian), then END_MAGIC
+# Rounds reseed the Game's stream from the seed and round number (see Game.start_round),
+# so with the carried state a replay can start at any round.
+
+MAGIC = b"CLRP\x01"
+END_MAGIC = b"CLRE"
+_TRAILER = struct.Struct("<Q")
+
+# Replays don't need views, Infos or history
+REPLAY_CONFIG = {INFO_HISTORY_LIMIT: 0, INFO_HISTORY_SPILL: None, SKIP_VIEWS: True}
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def read_varint(data, pos):
+    """Returns (value, position after it)."""
+    n = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def round_state(game):
+    """What a round starts from that earlier rounds decided. JSON-able."""
+    players = []
+    for player in game.all_players():
+        players.append({"name": player.name,
+                        "primed_from": player.primed_from.name if player.prime_count else None,
+                        "hearts": player.hearts,
+                        "insane_hearts": player.insane_hearts})
+    return {"round": game.round_count,
+            "turns": game.turn_count,
+            "last_loser": game.last_loser.name if game.last_loser else None,
+            "players": players}
+
+
+class GameRecorder:
+    """Records a game for replaying. Make it once the Game is set up, before it runs.
+
+deck_spec: dict of Card class to count, as given to deck_from_dict.
+players: the Players given to Game.setup, in order."""
+    def __init__(self, game, deck_spec, players):
+        self.header = {"seed": game.seed,
+                       "deck": {cls.__name__: count for cls, count in deck_spec.items()},
+                       "config": {key: value for key, value in game._settings.items()
+                                  if key not in REPLAY_CONFIG},
+                       "players": [player.name for player in players]}
+        self.choices = bytearray()
+        self.rounds = [] # Index entries, as written to the file
+        self.winner = None
+        game.recorder = self
+
+    def round_start(self, game):
+        self.rounds.append({"offset": len(self.choices), "choices": 0, "state": round_state(game)})
+
+    def choice(self, i):
+        write_varint(self.choices, i)
+        self.rounds[-1]["choices"] += 1
+
+    def finish(self, game):
+        self.winner = game.winner.name if game.winner else None
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        header = json.dumps(self.header, separators=(",", ":")).encode()
+        write_varint(out, len(header))
+        out += header
+        start = len(out)
+        out += self.choices
+        index_at = len(out)
+        # Rounds' offsets count from the start of the choices
+        out += json.dumps({"rounds": self.rounds, "winner": self.winner,
+                           "choices_at": start}, separators=(",", ":")).encode()
+        out += _TRAILER.pack(index_at) + END_MAGIC
+        return bytes(out)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class ReplayActions(PlayerActions):
+    """Answers Queries with the recorded choices. Every seat shares config "choices", an iterator of indices."""
+    info_types = ()
+
+    def respond_to_query(self, query):
+        return query.options[next(self.config["choices"])]
+
+    def info_event(self, info):
+        pass
+
+
+class Replay:
+    """A recorded game, read back from GameRecorder.to_bytes (or a file, with Replay.load)."""
+    def __init__(self, data):
+        if not data.startswith(MAGIC) or not data.endswith(END_MAGIC):
+            raise ValueError("Not a replay.")
+        self.data = data
+        length, pos = read_varint(data, len(MAGIC))
+        self.header = json.loads(data[pos:pos+length])
+        index_at = _TRAILER.unpack_from(data, len(data) - len(END_MAGIC) - _TRAILER.size)[0]
+        index = json.loads(data[index_at:len(data) - len(END_MAGIC) - _TRAILER.size])
+        self.rounds = index["rounds"]
+        self.winner = index["winner"]
+        self._choices_at = index["choices_at"]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    @property
+    def n_rounds(self):
+        return len(self.rounds)
+
+    def choices(self, from_round=1):
+        """The recorded choices, from the start of round from_round (counting from 1) to the end of the game."""
+        pos = self._choices_at + self.rounds[from_round - 1]["offset"]
+        n = sum(entry["choices"] for entry in self.rounds[from_round - 1:])
+        for i in range(n):
+            value, pos = read_varint(self.data, pos)
+            yield value
+
+    def deck_spec(self):
+        return {getattr(library, name): count for name, count in self.header["deck"].items()}
+
+    def game(self, from_round=1):
+        """A Game ready to run from the start of round from_round, with no earlier rounds played."""
+        g = Game()
+        player_config = {"choices": self.choices(from_round)}
+        seats = [Player(g, action_class=ReplayActions, name=name, config=player_config)
+                 for name in self.header["players"]]
+        g.setup(deck_from_dict(self.deck_spec(), numbered=False), seats,
+                config={**self.header["config"], **REPLAY_CONFIG}, seed=self.header["seed"])
+        state = self.rounds[from_round - 1]["state"]
+        by_name = {player.name: player for player in seats}
+        for entry in state["players"]:
+            if entry["primed_from"]:
+                by_name[entry["name"]] = prime(by_name[entry["primed_from"]])
+            player = by_name[entry["name"]]
+            player.hearts = entry["hearts"]
+            player.insane_hearts = entry["insane_hearts"]
+        g.round_count = state["round"]
+        g.turn_count = state["turns"]
+        g.last_loser = by_name[state["last_loser"]] if state["last_loser"] else None
+        return g
+
+    def run(self, from_round=1):
+        """Play the rest of the game from round from_round, and return the finished Game."""
+        g = self.game(from_round)
+        g.run_game()
+        if (g.winner.name if g.winner else None) != self.winner:
+            log.error("Replay finished differently to the recording: " + str(g.winner) + ", not " + str(self.winner))
+        return g
@@ -1,11 +1,18 @@
-import random
+import math
+import time
+import logging
+log = logging.getLogger(__name__)
 
 from player_actions import *
 from cl_constants import *
+from game import Game
+from cards import Card, PlayOption
+
+class RandomActions(PlayerActions):
+    info_types = ()
 
-class RandomActions(PlayerActions):    
     def respond_to_query(self, query):
-        return random.choice(query.options)
+        return self.random_option(query.options)
 
     def info_event(self, info):
         pass # I don't care!
@@ -20,22 +27,23 @@ def log_actions(cls):
             self.debug = False
             self.logging = True
         # Yes this can be done with the logging module. Improve later.
-        def log(self, s):
+        def log(self, *parts):
+            """Print the parts together, anything not a str through recstr. Nothing is made into a string unless logging."""
             if self.logging:
-                print(s)
-        def dbg(self, s):
+                print("".join(part if isinstance(part, str) else recstr(part) for part in parts))
+        def dbg(self, *parts):
             if self.debug:
-                self.log(s)
+                self.log(*parts)
         def log_query_in(self, query):
             self.queries.append(query)
-            self.log("--"+self.name[0]+"--" + self.name + " asked: " + str(query.context))
-            self.log("     with options: " + recstr(query.options))
+            self.log("--", self.name[0], "--", self.name, " asked: ", query.context)
+            self.log("     with options: ", query.options)
         def log_query_out(self, query, resp):
             self.log("      Picking:")
-            self.log(recstr(resp))
+            self.log(resp)
         def log_info(self, info):
             self.infos.append(info)
-            self.log("["+self.name[0]+" "+str(len(self.infos)-1) + "] To " + self.name + ": " + str(info.context))
+            self.log("[", self.name[0], " ", len(self.infos)-1, "] To ", self.name, ": ", info.context)
         def info_event(self, info):
             self.log_info(info)
             if self.debug:
@@ -48,6 +56,10 @@ def log_actions(cls):
             resp = super().respond_to_query(query)
             self.log_query_out(query, resp)
             return resp
+    # Keep the decorated class's name, so it can be found again (e.g. by pickle or the CLI)
+    LoggingActions.__name__ = cls.__name__
+    LoggingActions.__qualname__ = cls.__qualname__
+    LoggingActions.__doc__ = cls.__doc__
     return LoggingActions
 
 @log_actions
@@ -80,10 +92,10 @@ class BasicActions(PlayerActions):
                 good_ops = ins_ops
             if LIB:
                 good_ops = [LIB]
-            self.log("     Only considering: " + recstr(good_ops))
-            return random.choice(good_ops)
+            self.log("     Only considering: ", good_ops)
+            return self.rng.choice(good_ops)
         self.log("Picking a random option: ")
-        return random.choice(query.options)
+        return self.random_option(query.options)
 
 @log_actions
 class InteractiveActions(PlayerActions):
@@ -95,4 +107,333 @@ class InteractiveActions(PlayerActions):
             return query.options[i]
         except:
             self.log("Error, picking randomly.")
-            return random.choice(query.options)
+            return self.random_option(query.options)
+
+
+# Information-set Monte Carlo tree search.
+# The searcher never looks at the real Game. For each rollout it deals out the cards it can't see
+# (other hands, the deck and the aside cards) at random, consistent with what it has been shown,
+# and plays the rest of the round out on a Game of its own.
+# One tree is shared by every deal, with a node per decision of the searcher's, keyed by option_key.
+
+SEARCHED_QUERIES = (WHICH_PLAY, WHICH_QUICK_PLAY)
+ROLLOUT_TURNS = 40 # Turns played in a rollout before calling it a draw
+ASIDE_CARDS = 2 # What the default Game.pull_aside takes
+
+def option_key(option):
+    """Identifies an option the same way in the real Game and in rollouts, e.g. (GUARD, "Guard", ("Beth",), 4)."""
+    if isinstance(option, str):
+        return option # NO
+    card = getattr(option, "card", None)
+    if card is None:
+        return None
+    number = option.parameters.get("number") if option.parameters else None
+    return (card.type_, option.mode, tuple(str(target) for target in option.targets), number)
+
+
+def card_class(card_type):
+    """The Card subclass with this type_."""
+    found = [Card]
+    for cls in found:
+        if cls.type_ == card_type:
+            return cls
+        found.extend(cls.__subclasses__())
+    raise KeyError(card_type)
+
+
+class _Node:
+    """Rollout results for picking one option, and the searcher's decisions after it."""
+    __slots__ = ("visits", "reward", "avail", "children")
+    def __init__(self):
+        self.visits = 0
+        self.reward = 0.0
+        self.avail = 0 # Rollouts where this option could have been picked
+        self.children = {}
+
+class _ForcedMismatch(Exception):
+    """A rollout couldn't recreate the play being responded to."""
+    pass
+
+class _Rollout:
+    """Picks the searcher's options for one rollout: down the tree until a new node is added, then at random."""
+    def __init__(self, root, exploration, rng):
+        self.node = root
+        self.path = []
+        self.in_tree = True
+        self.exploration = exploration
+        self.rng = rng
+
+    def choose(self, keys):
+        """Index of the option to pick."""
+        if not self.in_tree:
+            return self.rng.randrange(len(keys))
+        children = []
+        # In option order, not set order: keys hold None, whose hash differs between processes
+        for key in dict.fromkeys(keys):
+            if key not in self.node.children:
+                self.node.children[key] = _Node()
+            child = self.node.children[key]
+            child.avail += 1
+            children.append((key, child))
+        unvisited = [pair for pair in children if not pair[1].visits]
+        if unvisited:
+            # Expand one new node, then play on at random
+            key, child = self.rng.choice(unvisited)
+            self.in_tree = False
+        else:
+            key, child = max(children, key=lambda pair: pair[1].reward / pair[1].visits +
+                             self.exploration * math.sqrt(math.log(pair[1].avail) / pair[1].visits))
+        self.node = child
+        self.path.append(child)
+        return keys.index(key)
+
+    def backup(self, reward):
+        for node in self.path:
+            node.visits += 1
+            node.reward += reward
+
+
+class _SimActions(PlayerActions):
+    """Plays for a Player in a rollout.
+
+config "rollout": a _Rollout, for the searcher. "forced": option_key of the first play to make."""
+    info_types = ()
+
+    def setup(self):
+        self.rollout = self.config.get("rollout")
+        self.forced = self.config.get("forced")
+
+    def respond_to_query(self, query):
+        if query.context.type_ not in SEARCHED_QUERIES:
+            return self.random_option(query.options)
+        keys = [option_key(option) for option in query.options]
+        if self.forced is not None:
+            forced, self.forced = self.forced, None
+            if forced not in keys:
+                raise _ForcedMismatch(forced)
+            return query.options[keys.index(forced)]
+        if self.rollout:
+            return query.options[self.rollout.choose(keys)]
+        return self.random_option(query.options)
+
+    def info_event(self, info):
+        pass
+
+
+@log_actions
+class ISMCTSActions(PlayerActions):
+    """Information-set Monte Carlo tree search over which card to play, and quick plays.
+
+Needs the deck list, as config "deck" (dict of Card class to count, as for deck_from_dict).
+Other config: "rollouts" and "time_budget" (seconds) per decision, whichever runs out first; "exploration".
+Quick plays in response to another quick play can't be recreated, so use the tree from earlier in the turn if there is one.
+decision_times and decision_rollouts record each searched decision."""
+    rollouts = 100
+    time_budget = 1.0
+    exploration = 0.7
+
+    def setup(self):
+        deck = self.config.get("deck", {})
+        self.deck_types = [cls.type_ for cls, count in deck.items() for i in range(count)]
+        self.card_classes = {cls.type_: cls for cls in deck}
+        self.seats = [] # Player views, in the order they were listed at the start of the round
+        self.turn_order = 1
+        self.seen = {} # Player name to the type_ of a card we've been shown in their hand
+        self.turns_seen = 0
+        self.tree = None # (turns_seen, node) for the decision after the last one we made
+        self.decision_times = []
+        self.decision_rollouts = []
+
+    # Tracking what's been shown.
+
+    def info_event(self, info):
+        ctx = info.context
+        if ctx.type_ == ROUND_START:
+            self.seats = list(ctx.players)
+            self.turn_order = 1
+            self.seen = {}
+            self.tree = None
+        elif ctx.type_ == JOIN and ctx.source == PRIME:
+            # Primes sit just after the Player they primed from (see Game.prime_player)
+            names = [str(seat) for seat in self.seats]
+            original = str(ctx.player.primed_from)
+            self.seats.insert(names.index(original) + 1 if original in names else len(names), ctx.player)
+        elif ctx.type_ == TURN_START:
+            self.turns_seen += 1
+        elif ctx.type_ == CARD_PLAY:
+            if getattr(ctx.card, "type_", None) == NO_U and ctx.play_option.mode != QUICK:
+                self.turn_order *= -1
+        elif ctx.type_ == SEE_CARD:
+            card_type = getattr(ctx.card, "type_", None)
+            if ctx.players[0].uid == self.my_player.uid and card_type:
+                self.seen[str(ctx.players[1])] = card_type
+        elif ctx.type_ == DISCARD:
+            if self.seen.get(str(ctx.player)) == getattr(ctx.card, "type_", None):
+                del self.seen[str(ctx.player)]
+
+    # Deciding.
+
+    def respond_to_query(self, query):
+        if query.context.type_ in SEARCHED_QUERIES and len(query.options) > 1 and self.deck_types:
+            return self.search(query)
+        return self.random_option(query.options)
+
+    def search(self, query):
+        start = time.perf_counter()
+        keys = [option_key(option) for option in query.options]
+        root = None
+        if self.tree and self.tree[0] == self.turns_seen:
+            root = self.tree[1]
+        root = root if root else _Node()
+        current, forced = self.rollout_start(query)
+        n_rollouts = 0
+        if current:
+            limit = self.config.get("rollouts", self.rollouts)
+            budget = self.config.get("time_budget", self.time_budget)
+            exploration = self.config.get("exploration", self.exploration)
+            # Rollout Games would otherwise log as if they were real
+            previous = logging.root.manager.disable
+            logging.disable(logging.CRITICAL)
+            try:
+                while n_rollouts < limit and time.perf_counter() - start < budget:
+                    n_rollouts += 1
+                    if not self.rollout(_Rollout(root, exploration, self.rng), current, forced):
+                        break
+            finally:
+                logging.disable(previous)
+        # Most visited, as it's the least noisy
+        visits = [root.children[key].visits if key in root.children else 0 for key in keys]
+        if max(visits):
+            chosen = visits.index(max(visits))
+        else:
+            chosen = self.rng.randrange(len(keys))
+        self.tree = (self.turns_seen, root.children.get(keys[chosen]))
+        self.decision_times.append(time.perf_counter() - start)
+        self.decision_rollouts.append(n_rollouts)
+        return query.options[chosen]
+
+    def rollout_start(self, query):
+        """Whose make_play rollouts start from, and the option_key they're forced to play (or None)."""
+        if query.context.type_ == WHICH_PLAY:
+            return self.name, None
+        play_option = query.context.play_option
+        if play_option is None or play_option.quick or play_option.parameters.get("reversed"):
+            return None, None
+        return str(play_option.controller), option_key(play_option)
+
+    def rollout(self, rollout, current, forced):
+        """Deal, play out the round and update the tree. Returns False if rollouts can't recreate the decision."""
+        sim, me = self.determinize(rollout, current, forced)
+        try:
+            player = sim.current_player
+            sim.make_play(player)
+            if sim.active and player.alive:
+                sim.end_turn(player)
+            if sim.active:
+                sim.advance_player()
+                sim.play_turns(ROLLOUT_TURNS)
+            if not sim.active and not sim.round_winner and not sim.winner:
+                sim.check_round_end_win()
+        except _ForcedMismatch:
+            return False
+        except NotImplementedError:
+            # Game.draw can't yet handle the deck and aside both running out, which guessed deals
+            # (missing cards made during play, say) can hit sooner than the real Game; skip those
+            if sim.deck or sim.aside:
+                raise
+            return True
+        rollout.backup(self.reward(sim, me))
+        return True
+
+    def reward(self, sim, me):
+        """1 if we (or our prime) won the rollout Game's round, 0 if someone else did, 0.5 if nobody has yet."""
+        winner = sim.winner if sim.winner else sim.round_winner
+        if sim.active or not winner:
+            return 0.5
+        return 1.0 if winner.unprimed() is me.unprimed() else 0.0
+
+    def determinize(self, rollout, current, forced):
+        """A Game matching what we've been shown, with the hidden cards dealt at random.
+
+Returns the Game, with current_player set to current, and our own Player in it."""
+        unseen = list(self.deck_types)
+        def take(card_type):
+            if card_type in unseen:
+                unseen.remove(card_type)
+        hands = {}
+        discards = {}
+        for seat in self.seats:
+            discards[str(seat)] = list(seat.discard)
+            for card in seat.discard:
+                take(card.type_)
+        hands[self.name] = [card.type_ for card in self.my_player.hand]
+        for card_type in hands[self.name]:
+            take(card_type)
+        hand_sizes = {str(seat): len(seat.hand) for seat in self.seats}
+        # Put the play being responded to back in its player's hand
+        if forced:
+            hands[current] = [forced[0]]
+            if discards[current] and discards[current][-1].type_ == forced[0]:
+                discards[current].pop()
+                hand_sizes[current] += 1
+            else:
+                take(forced[0])
+        self.rng.shuffle(unseen)
+        for seat in self.seats:
+            name = str(seat)
+            if name == self.name:
+                continue
+            hand = hands.setdefault(name, [])
+            known = self.seen.get(name)
+            if known in unseen and len(hand) < hand_sizes[name]:
+                unseen.remove(known)
+                hand.append(known)
+            while len(hand) < hand_sizes[name] and unseen:
+                hand.append(unseen.pop())
+
+        sim = Game(config={INFO_HISTORY_LIMIT: 0, SKIP_VIEWS: True})
+        sim.seed_rng(self.rng.randrange(2**32))
+        by_name = {}
+        # Whoever they primed from first, so primes can be linked to them
+        for seat in sorted(self.seats, key=lambda seat: seat.prime_count):
+            name = str(seat)
+            config = {}
+            if name == self.name:
+                config["rollout"] = rollout
+            elif forced and name == current:
+                config["forced"] = forced
+            primed_from = by_name[str(seat.primed_from)] if seat.prime_count else None
+            player = Player(sim, action_class=_SimActions, name=name, primed_from=primed_from, config=config)
+            player.alive = seat.alive
+            player.protected = bool(seat.protected)
+            player.hearts = seat.hearts
+            player.insane_hearts = seat.insane_hearts
+            player.turns_played = seat.turns_played
+            for card_type in hands.get(name, ()):
+                player.give(self.make_card(sim, card_type))
+            for view in discards[name]:
+                card = self.make_card(sim, view.type_)
+                player.put_in_discard(card)
+                card.turn_played = view.turn_played
+                if view.played_as:
+                    card.played_as = PlayOption(card, mode=view.played_as.mode, controller=player)
+            by_name[name] = player
+        sim.players = [by_name[str(seat)] for seat in self.seats]
+        sim.player_order = list(sim.players)
+        sim.players_changed()
+        sim.aside = [self.make_card(sim, unseen.pop()) for i in range(min(ASIDE_CARDS, len(unseen)))]
+        sim.deck = [self.make_card(sim, card_type) for card_type in unseen]
+        sim.current_player = by_name[current]
+        sim.turn_order = self.turn_order
+        sim.round_count = 1
+        sim.active = True
+        return sim, by_name[self.name]
+
+    def make_card(self, sim, card_type):
+        if card_type not in self.card_classes:
+            # Made during play rather than dealt, e.g. MiGo Brain Cases
+            self.card_classes[card_type] = card_class(card_type)
+        card = self.card_classes[card_type]()
+        card.put_in_game(sim)
+        sim.all_cards.append(card)
+        return card
@@ -0,0 +1,229 @@
+import argparse
+import contextlib
+import random
+import time
+import logging
+log = logging.getLogger(__name__)
+
+from game import *
+from players import *
+from player_actions import *
+import sample_actions
+from game_runner import deck_from_dict, PRESET_DECKS
+from replay import GameRecorder
+
+# Headless running of many games, for bot evaluation and engine throughput.
+# Nothing here prints or logs while games are running; results are only returned.
+
+
+class GameResult:
+    """The outcome of a single headless game. Kept small so it can be sent between processes."""
+    def __init__(self, seed, winner, rounds, turns, wall_time, error=None, events=0, queries=0):
+        self.seed = seed # Enough to replay this game on its own
+        self.winner = winner # Seat index into the bot classes, or None if nobody won
+        self.rounds = rounds
+        self.turns = turns
+        self.wall_time = wall_time
+        self.error = error # repr of the exception if the engine crashed, else None
+        self.events = events # Events fired, counting refires
+        self.queries = queries # Queries Players were asked
+
+    def __repr__(self):
+        return ("GameResult(seed=" + str(self.seed) + ", winner=" + str(self.winner) +
+                ", rounds=" + str(self.rounds) + ", turns=" + str(self.turns) +
+                (", error=" + self.error if self.error else "") + ")")
+
+
+class SimulationResults:
+    """Aggregated GameResults for one set of seats."""
+    def __init__(self, bot_names, games=None, wall_time=None):
+        self.bot_names = list(bot_names)
+        self.games = list(games) if games else []
+        # Wall time for the whole run; if not measured, fall back to the sum of the games
+        self._wall_time = wall_time
+
+    def add(self, result):
+        self.games.append(result)
+
+    @property
+    def n_games(self):
+        return len(self.games)
+
+    @property
+    def wins(self):
+        """Wins per seat, in seat order. Games without a winner aren't counted."""
+        ret = [0]*len(self.bot_names)
+        for result in self.games:
+            if result.winner is not None:
+                ret[result.winner] += 1
+        return ret
+
+    @property
+    def errors(self):
+        """GameResults for games where the engine raised; replay them with run_one_game."""
+        return [result for result in self.games if result.error]
+
+    @property
+    def rounds(self):
+        return sum(result.rounds for result in self.games)
+
+    @property
+    def turns(self):
+        return sum(result.turns for result in self.games)
+
+    @property
+    def events(self):
+        return sum(result.events for result in self.games)
+
+    @property
+    def queries(self):
+        return sum(result.queries for result in self.games)
+
+    @property
+    def wall_time(self):
+        if self._wall_time is None:
+            return sum(result.wall_time for result in self.games)
+        return self._wall_time
+
+    @wall_time.setter
+    def wall_time(self, value):
+        self._wall_time = value
+
+    @property
+    def games_per_second(self):
+        return self.n_games / self.wall_time if self.wall_time else 0.0
+
+    def summary(self):
+        lines = [str(self.n_games) + " games, " + str(self.rounds) + " rounds, " +
+                 str(self.turns) + " turns in " + "%.3f" % self.wall_time + "s (" +
+                 "%.1f" % self.games_per_second + " games/s)"]
+        for name, wins in zip(self.bot_names, self.wins):
+            lines.append("  " + name + ": " + str(wins) + " wins")
+        if self.errors:
+            lines.append("  " + str(len(self.errors)) + " games crashed (seeds: " +
+                         ", ".join(str(result.seed) for result in self.errors[:5]) +
+                         (", ..." if len(self.errors) > 5 else "") + ")")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.summary()
+
+
+@contextlib.contextmanager
+def quiet():
+    """Turn off all logging for the duration; the engine logs at INFO and ERROR while running."""
+    previous = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logging.disable(previous)
+
+
+_silenced_classes = {}
+
+def silenced(action_class):
+    """A subclass of action_class that doesn't print. Primed players reuse the class, so they stay quiet too."""
+    if action_class not in _silenced_classes:
+        class Silenced(action_class):
+            def setup(self):
+                super().setup()
+                # LoggingActions prints everything unless told otherwise
+                self.logging = False
+                self.debug = False
+        Silenced.__name__ = action_class.__name__
+        Silenced.__qualname__ = action_class.__qualname__
+        _silenced_classes[action_class] = Silenced
+    return _silenced_classes[action_class]
+
+
+def bot_names(bot_classes):
+    """Unique seat names for a list of PlayerActions classes."""
+    return [cls.__name__ + " " + str(i+1) for i, cls in enumerate(bot_classes)]
+
+
+def run_one_game(deck_spec, bot_classes, seed, config=None, player_config=None, record=None, stats=None):
+    """Play a single game to completion with no output, and return a GameResult.
+
+Bots are told the deck list, as player config "deck", along with anything in player_config.
+If the engine raises, the game is recorded with its error rather than stopping a whole run.
+All randomness comes from the Game's streams, seeded with seed, so games can be run side by side.
+record: a path to save a replay of the game to (see replay.py).
+stats: a stats.GameStats to time and count the game with."""
+    start = time.perf_counter()
+    g = Game()
+    player_config = {"deck": deck_spec, **(player_config if player_config else {})}
+    seats = [Player(g, action_class=silenced(cls), name=name, config=player_config)
+             for cls, name in zip(bot_classes, bot_names(bot_classes))]
+    # Nobody looks at the whole game's history afterwards, so don't keep it
+    config = {INFO_HISTORY_LIMIT: 0, **(config if config else {})}
+    g.setup(deck_from_dict(deck_spec, numbered=False), seats, config=config, seed=seed)
+    recorder = GameRecorder(g, deck_spec, seats) if record else None
+    g.stats = stats
+    try:
+        g.run_game()
+    except Exception as e:
+        return GameResult(seed, None, g.round_count, g.turn_count,
+                          time.perf_counter() - start, error=repr(e),
+                          events=g.events_fired, queries=g.queries_asked)
+    finally:
+        # Crashed games are worth keeping too
+        if recorder:
+            recorder.finish(g)
+            recorder.save(record)
+    winner = None
+    if g.winner:
+        winner = seats.index(g.winner.unprimed())
+    return GameResult(seed, winner, g.round_count, g.turn_count,
+                      time.perf_counter() - start,
+                      events=g.events_fired, queries=g.queries_asked)
+
+
+def game_seeds(seed, n_games):
+    """Per-game seeds derived from one seed, so any single game can be replayed with run_one_game."""
+    seeder = random.Random(seed)
+    return [seeder.randrange(2**32) for i in range(n_games)]
+
+
+def simulate(deck_spec, bot_classes, n_games, seed=None, config=None, player_config=None):
+    """Run n_games headless games and return the aggregated SimulationResults.
+
+deck_spec: dict of Card class to count, as for deck_from_dict.
+bot_classes: PlayerActions subclasses, one per seat.
+seed: seeds every game, so the whole run is reproducible. Random if not given.
+player_config: extra bot settings, e.g. {"rollouts": 50} for ISMCTSActions."""
+    results = SimulationResults(bot_names(bot_classes))
+    start = time.perf_counter()
+    with quiet():
+        for game_seed in game_seeds(seed, n_games):
+            results.add(run_one_game(deck_spec, bot_classes, game_seed, config, player_config))
+    results.wall_time = time.perf_counter() - start
+    return results
+
+
+def bot_class(name):
+    """Look up a PlayerActions subclass by name in sample_actions."""
+    cls = getattr(sample_actions, name, None)
+    if not (isinstance(cls, type) and issubclass(cls, PlayerActions)):
+        raise ValueError(name + " is not a PlayerActions class in sample_actions.")
+    return cls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless games between bots.")
+    parser.add_argument("--deck", default="two_immortals", choices=sorted(PRESET_DECKS),
+                        help="Preset deck and config to play with.")
+    parser.add_argument("--bots", nargs="+", default=["BasicActions", "RandomActions"],
+                        help="PlayerActions classes from sample_actions, one per seat.")
+    parser.add_argument("-n", "--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    deck, config = PRESET_DECKS[args.deck]
+    results = simulate(deck, [bot_class(name) for name in args.bots], args.games,
+                       seed=args.seed, config=config)
+    print(results.summary())
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import cProfile
+import pstats
+import time
+import logging
+log = logging.getLogger(__name__)
+
+from simulation import *
+
+# Where a Game's time goes. Attach a GameStats as game.stats (or pass stats= to run_one_game);
+# with nothing attached, the Game only pays for checking whether one is.
+
+
+class Timing:
+    """Calls and time spent in one kind of thing. Times include anything nested inside."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {"count": self.count, "total_s": self.total,
+                "mean_us": self.mean * 1e6, "max_us": self.max * 1e6}
+
+
+class GameStats:
+    """Timings and counters for a Game, or several Games one after the other.
+
+phases: turn steps by name (start_turn, insanity_checks, try_to_draw, make_play, end_turn).
+fires, resolves: Game.fire_event and Event.resolve, by context type.
+queries: Query.ask, by (player name, query context type); the time the player took to answer.
+interrupts: firings cut short by a new Event. refires: Events fired again after an interruption or pre events."""
+    def __init__(self):
+        self.phases = {}
+        self.fires = {}
+        self.resolves = {}
+        self.queries = {}
+        self.interrupts = 0
+        self.refires = 0
+
+    def add(self, table, key, seconds):
+        if key not in table:
+            table[key] = Timing()
+        table[key].add(seconds)
+
+    def timed(self, table, key, fn, *args):
+        """Call fn(*args), adding the time it took to table[key]."""
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.add(table, key, time.perf_counter() - start)
+
+    def as_dict(self):
+        """Everything as plain dicts and numbers, e.g. for json."""
+        def timings(table):
+            return {(key if isinstance(key, str) else " ".join(key)): timing.as_dict()
+                    for key, timing in sorted(table.items(), key=lambda item: -item[1].total)}
+        return {"phases": timings(self.phases), "fires": timings(self.fires),
+                "resolves": timings(self.resolves), "queries": timings(self.queries),
+                "interrupts": self.interrupts, "refires": self.refires}
+
+    def summary(self, limit=8):
+        lines = ["interrupts: " + str(self.interrupts) + ", refires: " + str(self.refires)]
+        for title, table in (("phases", self.phases), ("fire_event", self.fires),
+                             ("resolve", self.resolves), ("Query.ask", self.queries)):
+            lines.append(title + ":")
+            for key, timing in sorted(table.items(), key=lambda item: -item[1].total)[:limit]:
+                lines.append("  " + (key if isinstance(key, str) else " ".join(key)) + ": " +
+                             str(timing.count) + " calls, " + "%.1f" % (timing.total * 1e3) + "ms total, " +
+                             "%.1f" % (timing.mean * 1e6) + "us mean")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.summary()
+
+
+def profile_game(deck_spec, bot_classes, seed, config=None, player_config=None):
+    """Play one game under cProfile, with a GameStats attached.
+
+Returns (GameResult, GameStats, pstats.Stats)."""
+    stats = GameStats()
+    profiler = cProfile.Profile()
+    with quiet():
+        result = profiler.runcall(run_one_game, deck_spec, bot_classes, seed, config, player_config,
+                                  stats=stats)
+    return result, stats, pstats.Stats(profiler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and profile one headless game.")
+    parser.add_argument("--deck", default="two_immortals", choices=sorted(PRESET_DECKS))
+    parser.add_argument("--bots", nargs="+", default=["BasicActions", "BasicActions"],
+                        help="PlayerActions classes from sample_actions, one per seat.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", type=int, default=20, metavar="N",
+                        help="Show the top N functions by cumulative time (0 for none).")
+    args = parser.parse_args(argv)
+    deck, config = PRESET_DECKS[args.deck]
+    result, stats, profile = profile_game(deck, [bot_class(name) for name in args.bots], args.seed, config)
+    print(result)
+    print(stats.summary())
+    if args.profile:
+        profile.sort_stats("cumulative").print_stats(args.profile)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
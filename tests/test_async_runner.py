@@ -0,0 +1,83 @@
+import asyncio
+
+from async_runner import *
+from async_runner import _game_executor
+from sample_actions import *
+
+
+async def unreliable_client(channel):
+    """Answers out of range, late (after the timeout), or after a stray answer to nothing, in turn."""
+    n = 0
+    while True:
+        message = await channel.to_client.get()
+        if message is None:
+            return
+        if message["kind"] != "query":
+            continue
+        n += 1
+        if n % 3 == 0:
+            await asyncio.sleep(0.05)
+            await channel.to_game.put({"id": message["id"], "index": 0})
+        elif n % 3 == 1:
+            await channel.to_game.put({"id": message["id"], "index": message["count"]})
+        else:
+            await channel.to_game.put({"id": message["id"] - 1, "index": 0})
+            await channel.to_game.put({"id": message["id"], "index": message["count"] - 1})
+
+
+def test_bad_answers_are_dropped():
+    async def play(seed):
+        deck, config = PRESET_DECKS["nope_heavy"]
+        channel = QueueChannel()
+        client = asyncio.create_task(unreliable_client(channel))
+        result = await play_game(deck, [RemoteActions, BasicActions], seed, config,
+                                 {"channel": channel, "timeout": 0.01})
+        channel.close()
+        await client
+        return result
+    with quiet():
+        for seed in range(5):
+            result = asyncio.run(play(seed))
+            assert result.error is None
+            assert result.winner is not None
+
+
+def test_games_share_a_bounded_pool():
+    deck, config = PRESET_DECKS["plain"]
+    results = asyncio.run(play_remote_games(deck, BasicActions, 12, seed=1, config=config, max_games=3))
+    assert len(results.games) == 12
+    assert not results.errors
+    assert _game_executor(10 * MAX_GAME_THREADS)._max_workers == MAX_GAME_THREADS
+
+
+def test_more_waiting_games_than_threads():
+    """Twice as many games as threads, all with slow clients: they all finish, max_games waiting at a time."""
+    waiting = {"now": 0, "most": 0}
+    async def slow_client(channel):
+        while True:
+            message = await channel.to_client.get()
+            if message is None:
+                return
+            if message["kind"] == "query":
+                waiting["now"] += 1
+                waiting["most"] = max(waiting["most"], waiting["now"])
+                await asyncio.sleep(0.01)
+                waiting["now"] -= 1
+                await channel.to_game.put({"id": message["id"], "index": 0})
+    async def play(n_games, max_games):
+        deck, config = PRESET_DECKS["plain"]
+        async def one_game(seed, executor):
+            channel = QueueChannel()
+            client = asyncio.create_task(slow_client(channel))
+            result = await play_game(deck, [RemoteActions, BasicActions], seed, config, {"channel": channel}, executor)
+            channel.close()
+            await client
+            return result
+        with _game_executor(n_games, max_games) as executor, quiet():
+            # A deadlock would time out rather than hang the tests
+            return await asyncio.wait_for(asyncio.gather(*[one_game(seed, executor) for seed in range(n_games)]), 60)
+    results = asyncio.run(play(8, 4))
+    assert len(results) == 8
+    assert all(result.error is None and result.winner is not None for result in results)
+    # Not one at a time, and never more than the cap
+    assert waiting["most"] == 4
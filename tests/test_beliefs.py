@@ -0,0 +1,36 @@
+import pytest
+
+from simulation import *
+from game_runner import *
+from beliefs import *
+
+
+class CheckedActions(BasicActions):
+    """Checks that no hand has more cards known in it than it holds, after every Info."""
+    def setup(self):
+        super().setup()
+        self.checked = 0
+    def info_event(self, info):
+        super().info_event(info)
+        beliefs = self.beliefs
+        assert (beliefs.known.sum(axis=1) + beliefs.outside <= beliefs.hand_sizes).all(), str(info)
+        assert (beliefs.unseen >= 0).all(), str(info)
+        if self.name in beliefs.rows:
+            assert beliefs.hand_sizes[beliefs.rows[self.name]] == len(self.my_player.hand), str(info)
+        self.checked += 1
+
+CheckedActions = track_beliefs(CheckedActions)
+
+
+@pytest.mark.parametrize("preset", ["plain", "nope_heavy", "two_immortals"])
+def test_known_cards_fit_in_hands(preset):
+    deck, config = PRESET_DECKS[preset]
+    for seed in range(10):
+        g = Game()
+        players = [Player(g, action_class=silenced(CheckedActions), name=name, config={"deck": deck})
+                   for name in "ABC"]
+        g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=seed)
+        with quiet():
+            g.run_game()
+        assert all(player.actions.checked for player in players)
+
@@ -0,0 +1,89 @@
+import random
+
+from events import *
+
+
+class Queued:
+    """Stands in for an Event; EventStack only needs a uid."""
+    def __init__(self, uid):
+        self.uid = uid
+    def __repr__(self):
+        return "Queued(" + str(self.uid) + ")"
+
+
+class ListStack:
+    """The Game's old event queue: a list, with the same operations done as Game did them."""
+    def __init__(self):
+        self.events = []
+    def push(self, event):
+        self.events.append(event)
+    def insert_after(self, uid, event):
+        try:
+            i = [e.uid for e in self.events].index(uid)
+        except ValueError:
+            i = -1
+        self.events.insert(i+1, event)
+    def top(self):
+        return self.events[-1]
+    def remove(self, event):
+        self.events.remove(event)
+
+
+def check_same(stack, reference):
+    assert list(stack) == reference.events
+    assert len(stack) == len(reference.events)
+    assert bool(stack) == bool(reference.events)
+    if reference.events:
+        assert stack.top() is reference.top()
+
+
+def test_insert_after_and_remove_from_the_middle():
+    events = [Queued(uid) for uid in range(6)]
+    stack, reference = EventStack(), ListStack()
+    for event in events[:4]:
+        stack.push(event)
+        reference.push(event)
+    stack.insert_after(1, events[4])
+    reference.insert_after(1, events[4])
+    check_same(stack, reference)
+    assert [event.uid for event in stack] == [0, 1, 4, 2, 3]
+    # An absent uid puts it at the bottom
+    stack.insert_after(99, events[5])
+    reference.insert_after(99, events[5])
+    check_same(stack, reference)
+    assert [event.uid for event in stack] == [5, 0, 1, 4, 2, 3]
+    for event in (events[4], events[1], events[5]):
+        stack.remove(event)
+        reference.remove(event)
+        check_same(stack, reference)
+    assert [event.uid for event in stack] == [0, 2, 3]
+    # Inserting after a removed Event goes to the bottom too
+    stack.insert_after(4, events[4])
+    reference.insert_after(4, events[4])
+    check_same(stack, reference)
+    assert stack.pop() is events[3]
+
+
+def test_matches_a_list_through_random_operations():
+    rng = random.Random(0)
+    for trial in range(200):
+        stack, reference = EventStack(), ListStack()
+        # Few uids, so some Events (and uids) are queued more than once
+        events = [Queued(uid) for uid in range(rng.randint(1, 8))]
+        for step in range(60):
+            action = rng.random()
+            event = rng.choice(events)
+            if action < 0.35:
+                stack.push(event)
+                reference.push(event)
+            elif action < 0.7:
+                uid = rng.randrange(len(events) + 2)
+                stack.insert_after(uid, event)
+                reference.insert_after(uid, event)
+            elif reference.events:
+                # Mostly the top, as Game.clear_event_queue does; sometimes from the middle
+                event = reference.top() if action < 0.85 else rng.choice(reference.events)
+                stack.remove(event)
+                reference.remove(event)
+            check_same(stack, reference)
+            assert event in stack if event in reference.events else event not in stack
@@ -0,0 +1,75 @@
+from simulation import *
+from game_runner import *
+
+
+class CheckedISMCTS(ISMCTSActions):
+    """Compares the seats it tracks, and the Games it deals, with the real Game (config "game")."""
+    def setup(self):
+        super().setup()
+        self.checked_primes = 0
+        self.checked_own_prime = 0
+    def respond_to_query(self, query):
+        game = self.config.get("game")
+        if game and query.context.type_ == WHICH_PLAY:
+            real = [str(player) for player in game.player_order]
+            assert [str(seat) for seat in self.seats] == real
+            sim, me = self.determinize(None, self.name, None)
+            assert [str(player) for player in sim.player_order] == real
+            self.check_primes(game)
+            self.check_own_prime(game)
+        return super().respond_to_query(query)
+    def check_primes(self, game):
+        """Deal from each rotation of the seats, so some primes come before who they primed from."""
+        primes = [player for player in game.player_order if player.prime_count]
+        if not primes:
+            return
+        seats = self.seats
+        try:
+            for i in range(len(seats)):
+                self.seats = seats[i:] + seats[:i]
+                sim, me = self.determinize(None, self.name, None)
+                by_name = {player.name: player for player in sim.players}
+                for player in primes:
+                    prime = by_name[player.name]
+                    assert prime.primed_from is by_name[player.primed_from.name]
+                    assert prime.unprimed() is by_name[player.unprimed().name]
+        finally:
+            self.seats = seats
+        # Only counted once the checks have all passed, since Query.ask swallows AttributeErrors
+        self.checked_primes += len(primes)
+    def check_own_prime(self, game):
+        """Our prime's wins, and our original's, should both be ours."""
+        sim, me = self.determinize(None, self.name, None)
+        if not me.prime_count:
+            return
+        others = [player for player in sim.players if player.unprimed() is not me.unprimed()]
+        sim.active = False
+        for winner, reward in [(me, 1.0), (me.unprimed(), 1.0), (others[0], 0.0)]:
+            sim.round_winner = winner
+            assert self.reward(sim, me) == reward
+        self.checked_own_prime += 1
+
+
+def play(seed, deck_name):
+    deck, config = PRESET_DECKS[deck_name]
+    g = Game()
+    classes = [CheckedISMCTS, BasicActions, RandomActions]
+    players = [Player(g, action_class=silenced(cls), name=name, config={"deck": deck, "rollouts": 2, "game": g})
+               for cls, name in zip(classes, "ABC")]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=seed)
+    with quiet():
+        g.run_game()
+    return g, players
+
+
+def test_dealt_games_keep_the_real_turn_order_and_primes():
+    primes = own_primes = 0
+    for deck_name in ("plain", "nope_heavy"):
+        for seed in range(15):
+            g, players = play(seed, deck_name)
+            for player in g.all_players():
+                if isinstance(player.actions, CheckedISMCTS):
+                    primes += player.actions.checked_primes
+                    own_primes += player.actions.checked_own_prime
+    # Some of those decisions were made with a prime in the game, and some by our own prime
+    assert primes and own_primes
@@ -0,0 +1,91 @@
+import random
+
+import library
+from simulation import *
+from game_runner import *
+
+
+CARD_CLASSES = [cls for cls in vars(library).values()
+                if isinstance(cls, type) and issubclass(cls, Card) and cls.__module__ == "library"]
+
+
+def scanned(player, type_):
+    """The cards Game.fire_event used to show events to: every card in the discard then hand."""
+    return tuple(card for card in player.discard + player.hand if card.listens_for(type_))
+
+
+def test_listeners_follow_cards_moving():
+    deck, config = PRESET_DECKS["plain"]
+    g = Game()
+    players = [Player(g, action_class=silenced(RandomActions), name=name) for name in "ABC"]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=0)
+    with quiet():
+        g.start_round()
+    rng = random.Random(0)
+    for step in range(300):
+        player = rng.choice(players)
+        move = rng.randrange(5)
+        if move == 0 or not (player.hand or player.discard):
+            card = rng.choice(CARD_CLASSES)()
+            card.put_in_game(g)
+            g.all_cards.append(card)
+            player.give(card)
+        elif move == 1 and player.hand:
+            player.take(rng.choice(player.hand))
+        elif move == 2 and player.hand:
+            player.hand_to_discard(rng.choice(player.hand))
+        elif move == 3 and player.discard:
+            player.take_from_discard(rng.choice(player.discard))
+        elif player.hand:
+            card = rng.choice(player.hand)
+            player.take(card)
+            player.put_in_discard(card)
+        # Every type is looked up each step, so a stale cache entry would show
+        for someone in players:
+            for type_ in EVENT_TYPES:
+                assert someone.listeners(type_) == scanned(someone, type_)
+
+
+def test_listened_types_cover_what_cards_see():
+    for cls in CARD_CLASSES:
+        if cls.listens_to == ALL:
+            continue
+        for type_ in EVENT_TYPES:
+            if type_ not in cls.listens_to:
+                assert type_ not in cls._see_dispatch
+        assert cls.see_other_event is Card.see_other_event
+
+
+class ScanningGame(Game):
+    """Checks each Event's listeners against a scan of every card, and that the cards skipped do nothing."""
+    checked = 0
+    skipped = 0
+    def fire_event(self, event):
+        for player in self.players:
+            assert player.listeners(event.context.type_) == scanned(player, event.context.type_)
+        self.checked += 1
+        return super().fire_event(event)
+    def priority_order(self, event, players=None):
+        # Called once the Event has fired, just before anyone's cards see it
+        type_ = event.context.type_
+        for player in self.players:
+            if player.alive:
+                listening = player.listeners(type_)
+                for card in player.discard + player.hand:
+                    if card not in listening:
+                        assert not card.see_event(event)
+                        self.skipped += 1
+        return super().priority_order(event, players)
+
+
+def test_dispatch_matches_a_full_scan():
+    for deck_name in PRESET_DECKS:
+        deck, config = PRESET_DECKS[deck_name]
+        for seed in range(3):
+            g = ScanningGame()
+            players = [Player(g, action_class=silenced(RandomActions), name=name) for name in "ABC"]
+            g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=seed)
+            with quiet():
+                g.run_game()
+            assert g.winner
+            assert g.checked and g.skipped
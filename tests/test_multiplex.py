@@ -0,0 +1,27 @@
+import threading
+
+from multiplex import *
+from sample_actions import *
+
+
+def test_bots_match_simulate():
+    deck, config = PRESET_DECKS["nope_heavy"]
+    together = Multiplexer(deck, [BasicActions, RandomActions], 40, seed=5, config=config, max_games=7).run()
+    alone = simulate(deck, [BasicActions, RandomActions], 40, seed=5, config=config)
+    assert [(game.seed, game.winner, game.turns) for game in together.games] == \
+           [(game.seed, game.winner, game.turns) for game in alone.games]
+
+
+def test_live_games_are_bounded():
+    deck, config = PRESET_DECKS["plain"]
+    before = threading.active_count()
+    most = [0]
+    answer = random_answers(1)
+    def answer_all(pending):
+        most[0] = max(most[0], threading.active_count() - before)
+        assert len(pending) <= 5
+        return answer(pending)
+    results = Multiplexer(deck, 2, 50, seed=1, config=config, max_games=5).run(answer_all)
+    assert len(results.games) == 50
+    assert not results.errors
+    assert 0 < most[0] <= 5
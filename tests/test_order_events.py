@@ -0,0 +1,88 @@
+from simulation import *
+from game_runner import *
+
+
+class LastOrderingActions(RandomActions):
+    """Orders event groups with the last ordering (the reverse of how they're given), counting the queries."""
+    def setup(self):
+        self.ordering_queries = 0
+    def respond_to_query(self, query):
+        if query.context.type_ == ORDER_EVENT_GROUPS:
+            self.ordering_queries += 1
+            options = query.options
+            return options[factorial(len(options.get_int_items())) - 1]
+        return super().respond_to_query(query)
+
+
+def started_game(seed=0):
+    deck, config = PRESET_DECKS["plain"]
+    g = Game()
+    players = [Player(g, action_class=silenced(LastOrderingActions), name=name) for name in "ABCD"]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=seed)
+    with quiet():
+        g.start_round()
+    g.current_player = players[0]
+    return g, players
+
+def event_for(player, number=1):
+    return Event(InsanityCheckContext(player, number))
+
+def group(*events):
+    grouping = list(events)
+    for event in events:
+        event.grouping = grouping
+    return events
+
+def queries(players):
+    return [player.actions.ordering_queries for player in players]
+
+
+def test_priority_order_and_groups_kept_together():
+    g, players = started_game()
+    a, b, c, d = players
+    main = Event(TurnStartContext(a))
+    for_b = group(event_for(b, 1), event_for(b, 2))
+    for_d = event_for(d)
+    no_player = Event(RoundStartContext(players))
+    ordered = g.order_events(main, [for_d, no_player, for_b[0], for_b[1]])
+    # After the current player, in turn order; anything without a player last
+    assert ordered == [for_b[0], for_b[1], for_d, no_player]
+    # Nobody had more than one group, so nobody was asked
+    assert queries(players) == [0, 0, 0, 0]
+
+
+def test_players_order_their_own_groups():
+    g, players = started_game()
+    a, b, c, d = players
+    main = Event(TurnStartContext(a))
+    first = event_for(c, 1)
+    second = group(event_for(c, 2), event_for(c, 3))
+    third = event_for(c, 4)
+    other = event_for(b)
+    ordered = g.order_events(main, [first, other, second[0], third, second[1]])
+    # c reverses their groups, but each group's Events stay in their original order
+    assert ordered == [other, third, second[0], second[1], first]
+    assert queries(players) == [0, 0, 1, 0]
+
+
+def test_orderings_of_more_than_twenty_groups():
+    g, players = started_game()
+    a, b, c, d = players
+    main = Event(TurnStartContext(a))
+    events = [event_for(c, i + 1) for i in range(25)]
+    ordered = g.order_events(main, events)
+    assert ordered == events[::-1]
+    assert queries(players) == [0, 0, 1, 0]
+
+
+def test_random_bots_order_more_than_twenty_groups():
+    deck, config = PRESET_DECKS["plain"]
+    g = Game()
+    players = [Player(g, action_class=silenced(RandomActions), name=name) for name in "AB"]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=1)
+    with quiet():
+        g.start_round()
+    g.current_player = players[0]
+    events = [event_for(players[1], i + 1) for i in range(25)]
+    ordered = g.order_events(Event(TurnStartContext(players[0])), events)
+    assert sorted(ordered, key=events.index) == events
@@ -0,0 +1,52 @@
+import copy
+import itertools
+import pickle
+import random
+
+import pytest
+
+from queries import *
+from queries import _FENWICK_FROM
+from player_actions import PlayerActions
+
+
+def test_small_orderings_are_numbered_like_permutations():
+    options = OrderingOptions("abcde")
+    for i, perm in enumerate(itertools.permutations("abcde")):
+        assert options[i] == perm
+        assert options.index(perm) == i
+    assert len(options) == 120
+
+
+@pytest.mark.parametrize("n", [2, 20, 21, _FENWICK_FROM - 1, _FENWICK_FROM, _FENWICK_FROM + 1, 200])
+def test_rank_and_unrank_round_trip(n):
+    rng = random.Random(n)
+    options = OrderingOptions([[i] for i in range(n)])
+    count = option_count(options)
+    assert count == factorial(n)
+    for i in [0, 1, count - 1] + [rng.randrange(count) for trial in range(20)]:
+        assert options.index(options[i]) == i
+    for trial in range(20):
+        perm = options.sample(rng)
+        assert perm in options
+        assert options[options.index(perm)] == perm
+    # Equal items, rather than the items themselves, are found too
+    assert options.index(tuple(list(item) for item in options[count - 1])) == count - 1
+
+
+def test_copies_find_their_own_items():
+    options = OrderingOptions([[1], [2]])
+    assert options.index(([2], [1])) == 1
+    for copied in (copy.deepcopy(options), pickle.loads(pickle.dumps(options))):
+        assert copied.index(([2], [1])) == 1
+        assert copied.index(copied[1]) == 1
+        assert copied.index(tuple(reversed(copied.get_int_items()))) == 1
+
+
+def test_random_option_samples_large_orderings():
+    actions = PlayerActions(None, {})
+    options = OrderingOptions([[i] for i in range(30)])
+    with pytest.raises(OverflowError):
+        len(options)
+    assert actions.random_option(options) in options
+    assert actions.random_option([1, 2, 3]) in (1, 2, 3)
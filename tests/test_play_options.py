@@ -0,0 +1,108 @@
+import pytest
+
+from simulation import *
+from game_runner import *
+
+
+class LastOptionActions(RandomActions):
+    """Always plays the last option, checking the others were never made or projected."""
+    def setup(self):
+        self.lazy = 0
+    def respond_to_query(self, query):
+        options = query.options
+        if isinstance(options, ProjectedOptions):
+            chosen = options[len(options) - 1]
+            assert chosen is options[-1]
+            assert options.index(chosen) == len(options) - 1 and chosen in options
+            assert sum(seen is not None for seen in options._seen) == 1
+            assert sum(made is not None for made in options._options._made) <= 1 + options._options._specs.count(None)
+            self.lazy += 1
+            return chosen
+        return super().respond_to_query(query)
+
+
+def test_options_are_projected_when_looked_at():
+    deck, config = PRESET_DECKS["two_immortals"]
+    g = Game()
+    players = [Player(g, action_class=silenced(LastOptionActions), name=name) for name in "AB"]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=3)
+    with quiet():
+        g.run_game()
+    assert g.winner
+    assert sum(player.actions.lazy for player in players)
+
+
+def option_summary(options):
+    return [(option.mode, tuple(player.uid for player in option.targets), sorted(option.parameters.items()))
+            for option, force in options]
+
+def started_game(deck_name="two_immortals", seed=0, config=None):
+    deck, deck_config = PRESET_DECKS[deck_name]
+    g = Game()
+    players = [Player(g, action_class=silenced(RandomActions), name=name) for name in "ABC"]
+    g.setup(deck_from_dict(deck, numbered=False), players, config={**deck_config, **(config or {})}, seed=seed)
+    with quiet():
+        g.start_round()
+    return g, players
+
+def give_new(g, player, card_class):
+    card = card_class()
+    card.put_in_game(g)
+    g.all_cards.append(card)
+    player.give(card)
+    return card
+
+
+@pytest.mark.parametrize("card_class", [Cthulhu, DeepOnes, LiberIvonis, MiGo])
+def test_options_follow_insanity(card_class):
+    g, players = started_game()
+    a = players[0]
+    card = give_new(g, a, card_class)
+    for insanity in range(4):
+        assert a.how_insane() == insanity
+        # Straight from the Game's cache, even for cards that don't use it, so a stale entry would show
+        cached = [(PlayOption.from_spec(card, spec), force) for spec, force in g.play_option_specs(card)]
+        assert option_summary(cached) == option_summary(card.build_play_options())
+        assert option_summary(card.play_options()) == option_summary(card.build_play_options())
+        a.put_in_discard(give_new(g, players[1], MiGo) and players[1].hand.pop())
+    modes = [option.mode for option, force in card.play_options()]
+    assert INSANE in modes
+
+
+def test_cthulhu_wins_once_twice_insane():
+    g, players = started_game()
+    a = players[0]
+    cthulhu = give_new(g, a, Cthulhu)
+    a.put_in_discard(give_new(g, players[1], MiGo) and players[1].hand.pop())
+    assert INSANE not in [option.mode for option, force in cthulhu.play_options()]
+    a.put_in_discard(give_new(g, players[1], MiGo) and players[1].hand.pop())
+    assert INSANE in [option.mode for option, force in cthulhu.play_options()]
+
+
+class ComparingActions(RandomActions):
+    """Checks every card's cached play options against working them out again, whenever asked to play."""
+    def setup(self):
+        self.compared = 0
+        self.real = None
+    def respond_to_query(self, query):
+        if query.context.type_ == WHICH_PLAY and self.real:
+            for card in self.real.hand:
+                assert option_summary(card.play_options()) == option_summary(card.build_play_options()), card
+                self.compared += 1
+        return super().respond_to_query(query)
+
+
+@pytest.mark.parametrize("preset", ["plain", "nope_heavy", "two_immortals"])
+def test_cached_options_match_fresh_ones(preset):
+    deck, config = PRESET_DECKS[preset]
+    compared = 0
+    for seed in range(10):
+        g = Game()
+        players = [Player(g, action_class=silenced(ComparingActions), name=name) for name in "ABC"]
+        for player in players:
+            player.actions.real = player
+        g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=seed)
+        with quiet():
+            g.run_game()
+        compared += sum(player.actions.compared for player in g.all_players())
+    assert compared
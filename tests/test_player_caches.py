@@ -0,0 +1,71 @@
+from simulation import *
+from game_runner import *
+
+
+def started_game(seed=0):
+    deck, config = PRESET_DECKS["plain"]
+    g = Game()
+    players = [Player(g, action_class=silenced(RandomActions), name=name) for name in "ABCD"]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=seed)
+    with quiet():
+        g.start_round()
+    g.current_player = players[0]
+    return g, players
+
+def check_fresh(g):
+    """The cached answers match working them out from scratch."""
+    living = [player for player in g.players if player.alive]
+    assert g.living_players() == living
+    assert g.targetable_players() == [player for player in living if not player.protected]
+    start = g.turn_ring.step(g.current_player, g.turn_order)
+    assert g.play_order() == [player for player in g.turn_ring.from_(start, g.turn_order) if player.alive]
+
+
+def test_unchanged_players_reuse_the_cache():
+    g, players = started_game()
+    check_fresh(g)
+    living, targetable = g._living, g._targetable
+    assert g.play_order() == g.play_order()
+    check_fresh(g)
+    assert g._living is living and g._targetable is targetable
+
+
+def test_deaths_and_protection_drop_the_cache():
+    g, players = started_game()
+    a, b, c, d = players
+    check_fresh(g)
+    c.protected = True
+    check_fresh(g)
+    assert c not in g.targetable_players() and c in g.living_players()
+    b.alive = False
+    check_fresh(g)
+    assert b not in g.play_order()
+    c.protected = False
+    b.alive = True
+    check_fresh(g)
+    assert g.play_order() == [b, c, d, a]
+
+
+def test_joining_and_leaving_drop_the_cache():
+    g, players = started_game()
+    a, b, c, d = players
+    check_fresh(g)
+    with quiet():
+        g.kill_player(c)
+    prime = c.primed_to
+    check_fresh(g)
+    assert prime in g.living_players() and g.play_order() == [b, prime, d, a]
+    g.de_prime_players()
+    check_fresh(g)
+    assert prime not in g.living_players() and g.play_order() == [b, d, a]
+
+
+def test_forks_keep_their_own_cache():
+    g, players = started_game()
+    check_fresh(g)
+    copy = g.fork()
+    copy.players[1].alive = False
+    check_fresh(copy)
+    check_fresh(g)
+    assert players[1] in g.living_players()
+    assert len(copy.living_players()) == 3
@@ -0,0 +1,143 @@
+import re
+
+import library
+from simulation import *
+from game_runner import *
+
+
+def old_repl_str(rstr, ctx):
+    """repl_str as it was before str_fmts were compiled: replacing each field in turn."""
+    ret = rstr
+    if "{t}" in ret:
+        ret = ret.replace("{t}", str(ctx.type_))
+    if "{p}" in ret:
+        ret = ret.replace("{p}", str(cgd(ctx, "player")))
+    if "{ps}" in ret:
+        ret = ret.replace("{ps}", liststr(ctx.players) if chas(ctx, "players") else NOT_SET)
+    if "{c}" in ret:
+        ret = ret.replace("{c}", str(cgd(ctx, "card")))
+    if "{cs}" in ret:
+        ret = ret.replace("{cs}", liststr(ctx.cards) if chas(ctx, "cards") else NOT_SET)
+    if "{pcs}" in ret:
+        if chas(ctx, "players") and chas(ctx, "cards"):
+            ret = ret.replace("{pcs}",
+                  str([(str(ctx.players[i]) if ctx.players[i] else NOT_SET,
+                       str(ctx.cards[i]) if ctx.cards[i] else NOT_SET)
+                     for i in range(max(len(ctx.players),len(ctx.cards)))]))
+        else:
+            ret = ret.replace("{pcs}", NOT_SET)
+    if "{s}" in ret:
+        ret = ret.replace("{s}", str(cgd(ctx, "source")))
+    if "{po}" in ret:
+        ret = ret.replace("{po}", str(cgd(ctx, "play_option")))
+    if "{pos}" in ret:
+        ret = ret.replace("{pos}", liststr(cgd(ctx, "play_options", ())))
+    if "{ops}" in ret:
+        ret = ret.replace("{ops}", liststr(cgd(ctx, "options", ())))
+    if "{n}" in ret:
+        ret = ret.replace("{n}", str(cgd(ctx, "number")))
+    if "{nth}" in ret:
+        if chas(ctx, "number"):
+            n_str = str(ctx.number)
+            th_str = ["th", "st", "nd", "rd", "th", "th", "th", "th", "th", "th"][int(n_str[-1])]
+            ret = ret.replace("{nth}", n_str + th_str)
+        else:
+            ret = ret.replace("{nth}", NOT_SET)
+    while match := re.search(r"\{po\:(.*?)\}", ret):
+        param = match.group(1)
+        if chas(ctx,"play_option"):
+            if param == "target":
+                ret = ret.replace(match.group(0), str(ctx.play_option.targets[0]))
+            elif param == "targets":
+                ret = ret.replace(match.group(0), liststr(ctx.play_option.targets))
+            elif param == "mode":
+                ret = ret.replace(match.group(0), str(ctx.play_option.mode))
+            else:
+                ret = ret.replace(match.group(0),
+                    recstr(ctx.play_option.parameters.get(param, NOT_SET + " ["+param+"]")))
+        else:
+            ret = ret.replace(match.group(0), NOT_SET)
+    while match := re.search(r"\{ps\:(\d*)\}", ret):
+        param = int(match.group(1))
+        if chas(ctx, "players") and len(ctx.players) > param:
+            ret = ret.replace(match.group(0), str(ctx.players[param]))
+        else:
+            ret = ret.replace(match.group(0), NOT_SET)
+    return ret
+
+
+def subclasses(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from subclasses(sub)
+
+def library_str_fmts():
+    """Every str_fmt, pub_str_fmt and pri_str_fmt on a Context class, and every card class's play str_fmts."""
+    fmts = set()
+    for cls in subclasses(Context):
+        fmts.update(fmt for fmt in (cls.str_fmt, cls.pub_str_fmt, cls.pri_str_fmt) if fmt)
+    for cls in vars(library).values():
+        if isinstance(cls, type) and issubclass(cls, Card):
+            fmts.update(cls.play_str_fmts + cls.ins_play_str_fmts)
+    return fmts
+
+
+class Filled:
+    """A context with every field set."""
+    def __init__(self, g, players):
+        cards = g.all_cards[:3]
+        self.type_ = CARD_PLAY
+        self.player = players[0]
+        self.players = tuple(players)
+        self.card = cards[0]
+        self.cards = tuple(cards)
+        self.source = PLAYED
+        self.play_option = PlayOption(cards[0], mode=INSANE, targets=tuple(players[1:]),
+                                      parameters={"reversed_as": "No U", "guess": 4}, controller=players[0])
+        self.play_options = (self.play_option,)
+        self.options = (YES, NO)
+        self.number = 12
+
+class Empty:
+    """A context with only a type."""
+    type_ = TURN_START
+
+
+def rendered_alike(rstr, ctx):
+    assert repl_str(rstr, ctx) == old_repl_str(rstr, ctx), rstr
+
+
+def test_library_str_fmts_render_as_before():
+    deck, config = PRESET_DECKS["plain"]
+    g = Game()
+    players = [Player(g, action_class=silenced(RandomActions), name=name) for name in "ABC"]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=0)
+    with quiet():
+        g.start_round()
+    fmts = library_str_fmts()
+    # Including the ones cards give their PlayOptions directly
+    fmts.update(("Making {po:target} discard.", "No U on {po:targets}, as {po:reversed_as}",
+                 "{ps:0} then {ps:1} then {ps:5}", "{po:guess}, not {po:missing}", "{pcs} {nth}"))
+    assert len(fmts) > 40
+    for rstr in fmts:
+        rendered_alike(rstr, Filled(g, players))
+        rendered_alike(rstr, Empty())
+
+
+def test_game_contexts_render_as_before():
+    checked = 0
+    for deck_name in PRESET_DECKS:
+        deck, config = PRESET_DECKS[deck_name]
+        g = Game()
+        players = [Player(g, action_class=silenced(RandomActions), name=name) for name in "ABC"]
+        g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=1)
+        with quiet():
+            g.run_game()
+        for info in g.all_info_history:
+            ctx = info.context
+            # The Game's own context, and each Player's public and private views of it
+            for view in [ctx] + [project(ctx, player) for player in players for project in (public, private)]:
+                rendered_alike(view.str_fmt, view)
+                assert str(view) == repl_str(view.str_fmt, view)
+                checked += 1
+    assert checked > 1000
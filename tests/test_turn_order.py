@@ -0,0 +1,136 @@
+import itertools
+import random
+
+from simulation import *
+from game_runner import *
+
+
+# A plain list, as the Game kept turn order before TurnRing, for reference.
+
+def ref_from(order, start, direction, living=False):
+    i = order.index(start)
+    players = [order[(i + direction * j) % len(order)] for j in range(len(order))]
+    return [player for player in players if player.alive] if living else players
+
+def ref_play_order(order, current, direction):
+    return ref_from(order, ref_from(order, current, direction)[1], direction, living=True)
+
+def ref_turns_til(order, current, player, direction):
+    return ref_from(order, current, direction).index(player)
+
+
+class Seat:
+    def __init__(self, uid):
+        self.uid = uid
+        self.alive = True
+    def __repr__(self):
+        return "Seat(" + str(self.uid) + ")"
+
+
+def test_ring_matches_list():
+    rng = random.Random(0)
+    for trial in range(200):
+        order = []
+        ring = TurnRing()
+        uids = itertools.count()
+        for op in range(50):
+            r = rng.random()
+            if r < 0.35 or not order:
+                seat = Seat(next(uids))
+                i = rng.randrange(len(order) + 1)
+                order.insert(i, seat)
+                ring.insert(i, seat)
+            elif r < 0.5:
+                seat = order[0] if rng.random() < 0.3 else rng.choice(order)
+                order.remove(seat)
+                ring.remove(seat)
+            elif r < 0.6:
+                anchor = rng.choice(order)
+                seat = Seat(next(uids))
+                order.insert(order.index(anchor) + 1, seat)
+                ring.insert_after(anchor, seat)
+            else:
+                rng.choice(order).alive = rng.random() < 0.5
+                ring.living_changed()
+            assert list(ring) == order
+            if not order:
+                continue
+            a, b = rng.choice(order), rng.choice(order)
+            direction = rng.choice((1, -1))
+            assert ring.index(a) == order.index(a)
+            assert ring.step(a, direction) is ref_from(order, a, direction)[1 % len(order)]
+            assert list(ring.from_(a, direction)) == ref_from(order, a, direction)
+            assert list(ring.from_(a, direction, living=True)) == ref_from(order, a, direction, living=True)
+            assert ring.distance(a, b, direction) == ref_turns_til(order, a, b, direction)
+            after = [seat for seat in ref_from(order, a, direction)[1:] + [a] if seat.alive]
+            assert ring.step_living(a, direction) is (after[0] if after else None)
+
+
+def started_game(n_players=4, seed=0):
+    deck, config = PRESET_DECKS["plain"]
+    g = Game()
+    players = [Player(g, action_class=silenced(RandomActions), name=name) for name in "ABCDEF"[:n_players]]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=seed)
+    with quiet():
+        g.start_round()
+    return g, players
+
+def check_orders(g, order):
+    for current in order:
+        g.current_player = current
+        for direction in (1, -1):
+            g.turn_order = direction
+            assert g.player_order == order
+            assert g.play_order() == ref_play_order(order, current, direction)
+            assert g.play_order(start_with=current) == ref_from(order, current, direction, living=True)
+            for player in order:
+                assert g.turns_til(player) == ref_turns_til(order, current, player, direction)
+    g.turn_order = 1
+
+
+def test_play_order_and_turns_til():
+    g, players = started_game()
+    check_orders(g, list(players))
+
+
+def test_priming_sits_after_the_primed_player():
+    g, players = started_game()
+    a, b, c, d = players
+    with quiet():
+        g.kill_player(b)
+    prime = b.primed_to
+    assert prime is not None and not b.alive
+    check_orders(g, [a, b, prime, c, d])
+
+
+def test_reversal():
+    g, players = started_game()
+    a, b, c, d = players
+    g.current_player = c
+    g.turn_order = -1
+    assert g.play_order() == [b, a, d, c]
+    assert [g.turns_til(player) for player in players] == [2, 1, 0, 3]
+    g.advance_player()
+    assert g.current_player is b
+
+
+def test_dead_start_player():
+    g, players = started_game()
+    a, b, c, d = players
+    b.alive = False
+    g.current_player = b
+    assert g.play_order() == [c, d, a]
+    assert g.play_order(start_with=b) == [c, d, a]
+    assert g.turns_til(c) == 1
+    check_orders(g, list(players))
+
+
+def test_removing_the_first_player():
+    g, players = started_game()
+    a, b, c, d = players
+    g.active = False
+    with quiet():
+        g.drop_player(a)
+    assert a not in g.turn_ring
+    check_orders(g, [b, c, d])
+    assert g.turns_til(a) == -1
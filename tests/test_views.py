@@ -0,0 +1,88 @@
+from simulation import *
+from game_runner import *
+
+
+class PeekingActions(RandomActions):
+    """Records what its own view shows next to the real Player, on every query."""
+    def setup(self):
+        self.seen = []
+        self.real = None
+    def respond_to_query(self, query):
+        if self.real:
+            self.seen.append((self.snapshot(self.my_player), self.snapshot(self.real)))
+        return super().respond_to_query(query)
+    @staticmethod
+    def snapshot(player):
+        return ([card.type_ for card in player.hand],
+                [(card.type_, card.turn_played, card.played_as and card.played_as.mode) for card in player.discard])
+
+
+def play(seed):
+    deck, config = PRESET_DECKS["nope_heavy"]
+    g = Game()
+    players = [Player(g, action_class=silenced(PeekingActions), name=name) for name in "ABC"]
+    for player in players:
+        player.actions.real = player
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=seed)
+    with quiet():
+        g.run_game()
+    return g, players
+
+
+def test_own_view_shows_own_hand():
+    g, players = play(5)
+    checked = 0
+    for player in players:
+        for view, real in player.actions.seen:
+            assert view[0] == real[0]
+            checked += bool(real[0])
+    assert checked
+
+
+def test_own_discards_show_how_they_were_played():
+    g, players = play(6)
+    checked = 0
+    for player in players:
+        for view, real in player.actions.seen:
+            assert view[1] == real[1]
+            checked += bool(real[1])
+    assert checked
+
+
+def test_others_see_the_public_view():
+    g, players = play(7)
+    a, b = players[:2]
+    assert private(a, b) is public(a, b)
+    assert private(a, a) is not public(a, b)
+
+
+class TamperingActions(RandomActions):
+    """Tries to rewrite fields of every Player view it's shown, and records each attempt that got through."""
+    def setup(self):
+        self.tried = 0
+        self.got_through = []
+    def respond_to_query(self, query):
+        for player in getattr(query.context, "players", None) or (self.my_player,):
+            for attempt in (lambda: setattr(player, "alive", False),
+                            lambda: player.set_field("alive", False),
+                            lambda: object.__setattr__(player, "alive", False),
+                            lambda: setattr(player, "cheated", True)):
+                self.tried += 1
+                try:
+                    attempt()
+                except (ReadOnlyError, AttributeError, TypeError):
+                    continue
+                self.got_through.append(str(player))
+        return super().respond_to_query(query)
+
+
+def test_bots_cannot_change_view_fields():
+    deck, config = PRESET_DECKS["plain"]
+    g = Game()
+    players = [Player(g, action_class=silenced(TamperingActions), name=name) for name in "ABC"]
+    g.setup(deck_from_dict(deck, numbered=False), players, config=config, seed=3)
+    with quiet():
+        g.run_game()
+    for player in players:
+        assert player.actions.tried
+        assert player.actions.got_through == []
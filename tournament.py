@@ -0,0 +1,150 @@
+import argparse
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import logging
+log = logging.getLogger(__name__)
+
+from simulation import *
+
+# Tournaments between PlayerActions classes, spread over a pool of worker processes.
+# Each match's games are split into shards of seeds; the same workers are reused for every shard
+# of every match. Results are merged in (match, shard) order, so the outcome for a given seed
+# does not depend on how many workers ran it or which finished first.
+
+ROUND_ROBIN = "round_robin"
+GAUNTLET = "gauntlet"
+SCHEDULES = (ROUND_ROBIN, GAUNTLET)
+
+
+def round_robin(bot_classes):
+    """Every pair of bots plays, once in each seating."""
+    return [(a, b) for a, b in itertools.permutations(bot_classes, 2)]
+
+def gauntlet(challenger, opponents):
+    """The challenger plays each opponent, once in each seating."""
+    ret = []
+    for opponent in opponents:
+        ret.append((challenger, opponent))
+        ret.append((opponent, challenger))
+    return ret
+
+
+class TournamentResults:
+    """Per-match SimulationResults, in schedule order, plus overall standings."""
+    def __init__(self, matches, wall_time):
+        self.matches = matches # List of (bot_classes, SimulationResults)
+        self.wall_time = wall_time
+
+    @property
+    def n_games(self):
+        return sum(results.n_games for seats, results in self.matches)
+
+    @property
+    def games_per_second(self):
+        return self.n_games / self.wall_time if self.wall_time else 0.0
+
+    def standings(self):
+        """Dict of bot class name to [wins, games played], best first."""
+        table = {}
+        for seats, results in self.matches:
+            for cls, wins in zip(seats, results.wins):
+                entry = table.setdefault(cls.__name__, [0, 0])
+                entry[0] += wins
+                entry[1] += results.n_games
+        return dict(sorted(table.items(), key=lambda item: -item[1][0]/max(item[1][1], 1)))
+
+    def summary(self):
+        lines = [str(self.n_games) + " games in " + "%.3f" % self.wall_time + "s (" +
+                 "%.1f" % self.games_per_second + " games/s)"]
+        for name, (wins, games) in self.standings().items():
+            lines.append("  " + name + ": " + str(wins) + "/" + str(games) + " wins")
+        crashed = sum(len(results.errors) for seats, results in self.matches)
+        if crashed:
+            lines.append("  " + str(crashed) + " games crashed")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.summary()
+
+
+# Worker side. The deck and config are sent once per worker process, not once per shard.
+
+_worker_deck = None
+_worker_config = None
+
+def _init_worker(deck_spec, config):
+    global _worker_deck, _worker_config
+    _worker_deck = deck_spec
+    _worker_config = config
+
+def _play_shard(bot_classes, seeds):
+    with quiet():
+        return [run_one_game(_worker_deck, bot_classes, seed, _worker_config) for seed in seeds]
+
+
+def shards(seeds, shard_size):
+    return [seeds[i:i+shard_size] for i in range(0, len(seeds), shard_size)]
+
+
+def run_tournament(deck_spec, bot_classes, n_games, schedule=ROUND_ROBIN, seed=None,
+                   config=None, workers=None, shard_size=None):
+    """Run n_games per match for every match in the schedule, across a process pool.
+
+schedule: ROUND_ROBIN over all bot_classes, or GAUNTLET of bot_classes[0] against the rest.
+workers: number of processes (default os.cpu_count()).
+shard_size: games per task; defaults to splitting each match evenly over the workers.
+Bot classes must be importable at module level, so worker processes can unpickle them."""
+    if schedule == ROUND_ROBIN:
+        matches = round_robin(bot_classes)
+    elif schedule == GAUNTLET:
+        matches = gauntlet(bot_classes[0], bot_classes[1:])
+    else:
+        raise ValueError("Unknown schedule " + str(schedule) + "; use one of " + str(SCHEDULES))
+    workers = workers if workers else os.cpu_count()
+    if shard_size is None:
+        shard_size = max(1, -(-n_games // workers))
+    # Match seeds come from the tournament seed in schedule order, then game seeds from those
+    seeder = random.Random(seed)
+    match_seeds = [seeder.randrange(2**32) for match in matches]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(deck_spec, config)) as pool:
+        futures = [[pool.submit(_play_shard, seats, shard)
+                    for shard in shards(game_seeds(match_seed, n_games), shard_size)]
+                   for seats, match_seed in zip(matches, match_seeds)]
+        # Merge in submission order, not completion order
+        merged = []
+        for seats, match_futures in zip(matches, futures):
+            results = SimulationResults(bot_names(seats))
+            for future in match_futures:
+                for game_result in future.result():
+                    results.add(game_result)
+            merged.append((seats, results))
+    return TournamentResults(merged, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a tournament between bots over a process pool.")
+    parser.add_argument("--deck", default="two_immortals", choices=sorted(PRESET_DECKS))
+    parser.add_argument("--bots", nargs="+", default=["BasicActions", "RandomActions"],
+                        help="PlayerActions classes from sample_actions. For a gauntlet, the first is the challenger.")
+    parser.add_argument("--schedule", default=ROUND_ROBIN, choices=SCHEDULES)
+    parser.add_argument("-n", "--games", type=int, default=100, help="Games per match.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=None)
+    args = parser.parse_args(argv)
+    deck, config = PRESET_DECKS[args.deck]
+    results = run_tournament(deck, [bot_class(name) for name in args.bots], args.games,
+                             schedule=args.schedule, seed=args.seed, config=config,
+                             workers=args.workers, shard_size=args.shard_size)
+    print(results.summary())
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import copy
+import types
 import logging
 log = logging.getLogger(__name__)
 
@@ -47,11 +49,191 @@ def living(players):
     return [player for player in players if player.alive]
 
 
+class TurnRing:
+    """Players in turn order, as a ring: the Player after the last is the first again. Keyed by uid.
+
+step moves on from a Player either way round in O(1), and insert_after and remove are O(1) too.
+step_living skips dead Players in O(1); its links are rebuilt once after anyone dies or comes back,
+so call living_changed then. Iterating goes round once from the first Player added, like a list."""
+    def __init__(self, players=()):
+        self._players = {} # uid to Player
+        self._next = {} # uid to the Player after them
+        self._prev = {}
+        self._first = None
+        self._positions = None # uid to index from _first, for index and distance
+        self._next_living = None # uid to the next living Player each way round, for step_living
+        self._prev_living = None
+        for player in players:
+            self.append(player)
+
+    def __len__(self):
+        return len(self._players)
+
+    def __iter__(self):
+        return self.from_(self._first) if self._first else iter(())
+
+    def __contains__(self, player):
+        return getattr(player, "uid", None) in self._players
+
+    def index(self, player):
+        """Position from the first Player, like list.index."""
+        if player not in self:
+            raise ValueError(str(player) + " is not in the turn order.")
+        return self._position(player)
+
+    def _position(self, player):
+        if self._positions is None:
+            self._positions = {p.uid: i for i, p in enumerate(self)}
+        return self._positions[player.uid]
+
+    def _changed(self):
+        self._positions = None
+        self.living_changed()
+
+    def living_changed(self):
+        self._next_living = None
+        self._prev_living = None
+
+    # Changing who's in it.
+
+    def append(self, player):
+        """Add a Player just before the first, i.e. at the end of the list."""
+        if self._first is None:
+            self._players[player.uid] = player
+            self._next[player.uid] = self._prev[player.uid] = player
+            self._first = player
+            self._changed()
+        else:
+            self.insert_after(self._prev[self._first.uid], player)
+
+    def insert_after(self, anchor, player):
+        after = self._next[anchor.uid]
+        self._players[player.uid] = player
+        self._next[anchor.uid] = player
+        self._prev[player.uid] = self._players[anchor.uid]
+        self._next[player.uid] = after
+        self._prev[after.uid] = player
+        self._changed()
+
+    def insert(self, i, player):
+        """Like list.insert, for a Player to sit at position i. O(i); insert_after is O(1)."""
+        if self._first is None or i >= len(self):
+            self.append(player)
+            return
+        at = self._first
+        for j in range(i):
+            at = self._next[at.uid]
+        self.insert_after(self._prev[at.uid], player)
+        if i == 0:
+            self._first = player
+
+    def remove(self, player):
+        uid = player.uid
+        if len(self) == 1:
+            self._first = None
+        else:
+            before, after = self._prev[uid], self._next[uid]
+            self._next[before.uid] = after
+            self._prev[after.uid] = before
+            if self._first.uid == uid:
+                self._first = after
+        del self._players[uid], self._next[uid], self._prev[uid]
+        self._changed()
+
+    # Moving round.
+
+    def step(self, player, direction=1):
+        """The Player after player, going round forwards (direction 1) or backwards (-1)."""
+        return (self._next if direction > 0 else self._prev)[player.uid]
+
+    def step_living(self, player, direction=1):
+        """The next living Player after player (who may be dead) that way round, or None if nobody's alive.
+
+Gives player back if they're the only one alive."""
+        if self._next_living is None:
+            self._link_living()
+        return (self._next_living if direction > 0 else self._prev_living)[player.uid]
+
+    def _link_living(self):
+        order = list(self)
+        self._next_living = {}
+        self._prev_living = {}
+        # Twice round, so the links wrap; the second time round overwrites the first
+        for links, players in ((self._next_living, reversed(order + order)), (self._prev_living, order + order)):
+            found = None
+            for player in players:
+                links[player.uid] = found
+                if player.alive:
+                    found = player
+
+    def from_(self, player, direction=1, living=False):
+        """Everyone (or every living Player) once each, going round from player (included, if alive for living)."""
+        player = self._players[player.uid]
+        if living and not player.alive:
+            player = self.step_living(player, direction)
+            if player is None:
+                return
+        start = player
+        while True:
+            yield player
+            player = self.step_living(player, direction) if living else self.step(player, direction)
+            if player is start:
+                return
+
+    def distance(self, a, b, direction=1):
+        """How many steps from a round to b that way."""
+        return ((self._position(b) - self._position(a)) * direction) % len(self)
+
+
 def num_args(f):
     """How many arguments the function takes. Used to allow simpler Event callbacks."""
     return f.__code__.co_argcount
 
 
+# Shared rather than copied, skipping copy.deepcopy's dispatch
+_ATOMIC_TYPES = (str, int, float, bool, None.__class__)
+
+def copy_function(fn, memo):
+    """Deep copy a closure, giving it new cells holding deep copies of what it closed over.
+
+copy.deepcopy shares functions, so a copied Event's resolve_effect would otherwise still act on the original Game.
+Functions without a closure are shared as normal."""
+    if fn.__class__ in _ATOMIC_TYPES:
+        return fn
+    if not isinstance(fn, types.FunctionType) or not fn.__closure__:
+        return copy.deepcopy(fn, memo)
+    if id(fn) in memo:
+        return memo[id(fn)]
+    cells = []
+    for cell in fn.__closure__:
+        # Closures made in the same scope share cells, so their copies should too
+        if id(cell) not in memo:
+            memo[id(cell)] = types.CellType()
+        cells.append(memo[id(cell)])
+    new = types.FunctionType(fn.__code__, fn.__globals__, fn.__name__, fn.__defaults__, tuple(cells))
+    new.__kwdefaults__ = fn.__kwdefaults__
+    new.__dict__.update(fn.__dict__)
+    memo[id(fn)] = new
+    # Fill the cells after registering, in case the function refers to itself
+    for cell, new_cell in zip(fn.__closure__, cells):
+        try:
+            contents = cell.cell_contents
+        except ValueError:
+            continue # Not assigned yet
+        new_cell.cell_contents = copy.deepcopy(contents, memo)
+    return new
+
+def deepcopy_attributes(obj, memo):
+    """For use as __deepcopy__ by objects that hold closures, e.g. Event callbacks. Uses __getstate__ if defined.
+
+Also quicker than the default for objects with many plain attributes, e.g. Cards."""
+    new = obj.__class__.__new__(obj.__class__)
+    memo[id(obj)] = new
+    state = obj.__getstate__() if hasattr(obj, "__getstate__") else obj.__dict__
+    # object.__getstate__ gives None for an empty __dict__
+    new.__dict__.update({name: copy_function(value, memo) for name, value in (state or {}).items()})
+    return new
+
 
 def make_name_unique(base_name, game):
     cur_names = [p.name for p in game.players]
@@ -67,6 +249,30 @@ def make_name_unique(base_name, game):
         return base_name
 
 
+def dispatch_table(cls, call_str):
+    """Map context types to the methods of cls that split_context would call for them.
+
+call_str: String with {t} for type_, as for split_context. The 'other' method isn't included.
+Resolved once per class, rather than building method names for every call."""
+    prefix, suffix = call_str.split("{t}")
+    table = {}
+    for name in dir(cls):
+        if name.startswith(prefix) and name.endswith(suffix) and len(name) > len(prefix) + len(suffix):
+            type_name = name[len(prefix):len(name)-len(suffix)]
+            if type_name != "other":
+                table[type_name.upper()] = getattr(cls, name)
+    return table
+
+_dispatch_tables = {}
+
+def class_dispatch(cls, call_str):
+    """Cached dispatch_table for cls. Classes are expected not to gain methods after creation."""
+    key = (cls, call_str)
+    table = _dispatch_tables.get(key)
+    if table is None:
+        table = _dispatch_tables[key] = dispatch_table(cls, call_str)
+    return table
+
 def split_context(ctx, obj, call_str, *args, **kwargs):
     """Call specific methods of obj depending on context type. Uses lowercased type names.
 
@@ -74,6 +280,7 @@ obj: Object with relevant methods.
 call_str: String with {t} for type_, representing relevant methods.
 Will use {t} as 'other' if no method exists.
 Check EVENT_TYPES for valid options."""
-    desired = call_str.replace("{t}", ctx.type_.lower())
-    other = call_str.replace("{t}", "other")
-    return getattr(obj, desired, getattr(obj, other)).__call__(*args, **kwargs)
+    method = class_dispatch(obj.__class__, call_str).get(ctx.type_)
+    if method is None:
+        return getattr(obj, call_str.replace("{t}", "other"))(*args, **kwargs)
+    return method(obj, *args, **kwargs)